@@ -1,7 +1,7 @@
 import os
 import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Union
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from ..utils.state import SpecExtractionState, DATASET_TYPE_MAPPING
@@ -19,15 +19,15 @@ class ExtractionAgent:
             base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
         )
     
-    def process_source(self, source_name: str, product_name: str, file_content: str) -> Dict[str, Any]:
+    def process_source(self, source_name: str, product_name: str, file_content: Union[str, bytes, os.PathLike]) -> Dict[str, Any]:
         """Process a single data source with multiple chunks and batching"""
         start_time = time.time()
         
         try:
             logger.info(f"Starting processing for {source_name}")
             
-            # Process the data into chunks
-            data_chunks = DataProcessor.process_csv_data(file_content, source_name)
+            # Process the data into chunks (materialized: prompts need the total chunk count)
+            data_chunks = list(DataProcessor.process_csv_data(file_content, source_name))
             
             # Check if dataset was excluded due to insufficient rows
             if not data_chunks:  # Empty list means dataset was excluded
@@ -80,8 +80,8 @@ class ExtractionAgent:
             else:
                 extracted_specs = all_chunk_results[0]
             
-            # Debug: Log the final extracted specs
-            logger.info(f"Agent {source_name} final extracted specs: {extracted_specs}")
+            # Debug: Log the final extracted specs (can be tens of KB, so only formatted when DEBUG is on)
+            logger.debug("Agent %s final extracted specs: %s", source_name, extracted_specs)
             
             # Calculate processing time
             processing_time = time.time() - start_time
@@ -119,9 +119,9 @@ class ExtractionAgent:
         logger.info(f"Merging {len(chunk_results)} chunk results")
         
         # Create a consolidation prompt
-        merged_content = "\n\n--- CHUNK RESULTS TO MERGE ---\n\n"
-        for i, result in enumerate(chunk_results, 1):
-            merged_content += f"=== CHUNK {i} RESULTS ===\n{result}\n\n"
+        merged_content = "\n\n--- CHUNK RESULTS TO MERGE ---\n\n" + "".join(
+            f"=== CHUNK {i} RESULTS ===\n{result}\n\n" for i, result in enumerate(chunk_results, 1)
+        )
         
         consolidation_prompt = f"""<role>
 You are a data consolidation expert specializing in merging multi-chunk extraction results with high precision.
@@ -397,11 +397,10 @@ def process_pns_data(state: SpecExtractionState) -> SpecExtractionState:
             
             if extracted_specs:
                 # Format as table similar to other agents
-                formatted_specs = "# PNS SPECIFICATIONS (Top 5 by frequency)\n"
-                formatted_specs += "Rank,Specification,Options,Frequency,Status,Priority\n"
-                
-                for i, spec in enumerate(extracted_specs, 1):
-                    formatted_specs += f"{i},{spec.get('spec_name', 'N/A')},{spec.get('option', 'N/A')},{spec.get('frequency', 'N/A')},{spec.get('spec_status', 'N/A')},{spec.get('importance_level', 'N/A')}\n"
+                formatted_specs = "# PNS SPECIFICATIONS (Top 5 by frequency)\nRank,Specification,Options,Frequency,Status,Priority\n" + "".join(
+                    f"{i},{spec.get('spec_name', 'N/A')},{spec.get('option', 'N/A')},{spec.get('frequency', 'N/A')},{spec.get('spec_status', 'N/A')},{spec.get('importance_level', 'N/A')}\n"
+                    for i, spec in enumerate(extracted_specs, 1)
+                )
                 
                 processing_time = time.time() - start_time
                 
@@ -1,9 +1,30 @@
 import json
+import heapq
+import re
 import logging
 from typing import Dict, List, Any
 
 logger = logging.getLogger(__name__)
 
+# Optional: orjson parses large PNS payloads several times faster than the stdlib json module
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Spec categories read from the PNS JSON, in importance order
+PNS_SPEC_CATEGORIES = ["primary_specs", "secondary_specs", "tertiary_specs", "quaternary_specs"]
+_JSON_OBJECT_START_RE = re.compile(r'\s*\{')
+
+# Descriptive display terms for PNS spec statuses; unmapped statuses are shown as-is
+STATUS_DISPLAY = {
+    "Dominant": "✅ Dominant",
+    "Emerging": "🔶 Emerging",
+    "Exploring": "🔍 Exploring",
+    "Unknown": "❓ Unknown",
+}
+
 class PNSProcessor:
     """Handler for PNS JSON processing and spec extraction"""
     
@@ -15,15 +36,23 @@ class PNSProcessor:
         try:
             logger.info("Starting PNS JSON processing")
             
-            if not pns_json_content or not pns_json_content.strip():
+            if not pns_json_content or pns_json_content.isspace():
                 return {
                     "status": "failed",
                     "error": "No PNS JSON content provided",
                     "extracted_specs": []
                 }
             
-            # Parse JSON content
-            pns_data = json.loads(pns_json_content.strip())
+            # Fail fast before a full parse when the content cannot hold any spec category
+            if not _JSON_OBJECT_START_RE.match(pns_json_content) or not any(f'"{category}"' in pns_json_content for category in PNS_SPEC_CATEGORIES):
+                return {
+                    "status": "failed",
+                    "error": "No specification categories found in PNS JSON data",
+                    "extracted_specs": []
+                }
+            
+            # Parse JSON content (both parsers skip surrounding whitespace, so no stripped copy is needed)
+            pns_data = _json_loads(pns_json_content)
             
             # Extract specifications from all 4 categories
             extracted_specs = self._extract_top_specs_from_all_categories(pns_data)
@@ -66,9 +95,7 @@ class PNSProcessor:
         all_specs = []
         
         # Extract from all 4 categories
-        categories = ["primary_specs", "secondary_specs", "tertiary_specs", "quaternary_specs"]
-        
-        for category in categories:
+        for category in PNS_SPEC_CATEGORIES:
             if category in pns_data and isinstance(pns_data[category], list):
                 for spec in pns_data[category]:
                     if isinstance(spec, dict):
@@ -82,9 +109,8 @@ class PNSProcessor:
                         if processed_spec:
                             all_specs.append(processed_spec)
         
-        # Sort by frequency (descending) and take top 5
-        all_specs.sort(key=lambda x: x.get("total_frequency", 0), reverse=True)
-        top_5_specs = all_specs[:5]
+        # Select the top 5 by frequency (descending) without sorting every spec; ties keep input order
+        top_5_specs = heapq.nlargest(5, all_specs, key=lambda x: x.get("total_frequency", 0))
         
         logger.info(f"Extracted top {len(top_5_specs)} specifications from all categories based on frequency")
         return top_5_specs
@@ -95,53 +121,35 @@ class PNSProcessor:
             # Extract required fields with defaults
             spec_name = spec.get("spec_name", "Unknown Specification")
             
-            # Process all values and sort by frequency
-            all_values = []
-            if "values" in spec and isinstance(spec["values"], list):
-                for value_data in spec["values"]:
-                    if isinstance(value_data, dict):
-                        all_values.append({
-                            "option": value_data.get("standardized_value", "Unknown Option"),
-                            "frequency": value_data.get("frequency", 0),
-                            "status": value_data.get("spec_status", "Unknown")
-                        })
+            # Process all values and sort by frequency (descending) in a single pass
+            values = spec.get("values")
+            if not isinstance(values, list):
+                return None
+            
+            all_values = sorted(
+                (
+                    (
+                        value_data.get("standardized_value", "Unknown Option"),
+                        value_data.get("frequency", 0),
+                        value_data.get("spec_status", "Unknown")
+                    )
+                    for value_data in values if isinstance(value_data, dict)
+                ),
+                key=lambda value: value[1],
+                reverse=True
+            )
             
             if not all_values:
                 return None
             
-            # Sort by frequency (descending)
-            all_values.sort(key=lambda x: x["frequency"], reverse=True)
-            
             # Combine options, frequencies, and statuses with / separators
-            options = []
-            frequencies = []
-            statuses = []
-            total_frequency = 0
-            
-            for value in all_values:
-                options.append(value["option"])
-                frequencies.append(str(value["frequency"]))
-                total_frequency += value["frequency"]
-                
-                # Map status to descriptive terms
-                status = value["status"]
-                if status == "Dominant":
-                    status_display = "✅ Dominant"
-                elif status == "Emerging":
-                    status_display = "🔶 Emerging"  
-                elif status == "Exploring":
-                    status_display = "🔍 Exploring"
-                elif status == "Unknown":
-                    status_display = "❓ Unknown"
-                else:
-                    status_display = status
-                
-                statuses.append(status_display)
-            
-            # Format combined strings
+            options, frequencies, statuses = zip(*all_values)
+            total_frequency = sum(frequencies)
+            
+            # Format combined strings, mapping statuses to descriptive terms
             combined_options = " / ".join(options)
-            combined_frequency = f"{' / '.join(frequencies)} (Total: {total_frequency})"
-            combined_status = " / ".join(statuses)
+            combined_frequency = f"{' / '.join(map(str, frequencies))} (Total: {total_frequency})"
+            combined_status = " / ".join(STATUS_DISPLAY.get(status, status) for status in statuses)
             
             # Create combined spec format for display
             combined_spec = {
@@ -1,173 +1,89 @@
 import os
+import asyncio
 import logging
 import time
 import json
-from typing import Dict, Any, List
+import re
+import hashlib
+import threading
+import functools
+import itertools
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple, Callable, Optional
+from pydantic import BaseModel, Field, ValidationError
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from ..utils.state import SpecExtractionState, get_agents_status, get_agent_results
+from ..utils.parsers import (
+    parse_final_table_rows,
+    parse_triangulation_table_rows,
+    parse_csv_to_structured_format,
+    parse_pns_to_structured_format,
+    parse_validation_response
+)
 
 logger = logging.getLogger(__name__)
 
-# COMMENTED OUT - MetaEnsembleAgent no longer used
-# class MetaEnsembleAgent:
-#     """Agent for performing final ensemble triangulation of multiple runs"""
-#     
-#     def __init__(self):
-#         self.llm = ChatOpenAI(
-#             model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
-#             temperature=0.1
-#         )
-#     
-#     def ensemble_triangulate(self, state: SpecExtractionState) -> SpecExtractionState:
-#         """Perform final ensemble triangulation of 3 run results"""
-#         start_time = time.time()
-#         
-#         try:
-#             logger.info("Starting meta-ensemble triangulation")
-#             
-#             run_results = state["run_results"]
-#             if len(run_results) != 3:
-#                 raise ValueError(f"Expected 3 run results, got {len(run_results)}")
-#             
-#             # Build ensemble prompt
-#             prompt = self._build_ensemble_prompt(
-#                 product_name=state["product_name"],
-#                 run_results=run_results
-#             )
-#             
-#             logger.info("Sending meta-ensemble triangulation request")
-#             
-#             # Call LLM for final ensemble
-#             response = self.llm.invoke([HumanMessage(content=prompt)])
-#             final_result = response.content
-#             
-#             # Parse the final result into table format
-#             final_table = self._parse_ensemble_result(final_result)
-#             
-#             # Calculate processing time
-#             processing_time = time.time() - start_time
-#             
-#             logger.info(f"Meta-ensemble triangulation completed in {processing_time:.2f}s")
-#             
-#             return {
-#                 "final_ensemble_result": final_result,
-#                 "final_ensemble_table": final_table,
-#                 "current_step": "meta_ensemble_completed",
-#                 "progress_percentage": 100,
-#                 "logs": [f"Meta-ensemble triangulation completed successfully in {processing_time:.2f}s"]
-#             }
-#             
-#         except Exception as e:
-#             error_msg = str(e)
-#             logger.error(f"Error during meta-ensemble triangulation: {error_msg}")
-#             
-#             return {
-#                 "current_step": "meta_ensemble_failed",
-#                 "logs": [f"Meta-ensemble triangulation failed: {error_msg}"]
-#             }
-
-class TriangulationAgent:
-    """Agent for triangulating results from all sources"""
-    
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
-            temperature=0.1,
-            base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-        )
+# Optional: orjson serializes the dataset outputs embedded in prompts several times faster than json
+try:
+    import orjson
     
-    def triangulate_results(self, state: SpecExtractionState) -> SpecExtractionState:
-        """Triangulate results from all completed agents"""
-        start_time = time.time()
-        
-        try:
-            logger.info("Starting triangulation process")
-            
-            # Get all completed agent results using helper function
-            agent_results = get_agent_results(state)
-            completed_agents = {
-                source: result for source, result in agent_results.items()
-                if result.get("status") == "completed"
-            }
-            
-            if not completed_agents:
-                raise ValueError("No completed agent results to triangulate")
-            
-            # Prepare datasets for triangulation prompt
-            datasets = []
-            all_dataset_outputs = {}
-            
-            for source, result in completed_agents.items():
-                dataset_info = {
-                    "source": source,
-                    "type": result["source_type"],
-                    "rows_processed": result["raw_data_count"],
-                    "extracted_specs": result["extracted_specs"]
-                }
-                datasets.append(dataset_info)
-                all_dataset_outputs[source] = result["extracted_specs"]
-            
-            # Build triangulation prompt using multi-agent consensus and validation techniques
-            prompt = self._build_triangulation_prompt(
-                product_name=state["product_name"],
-                datasets=datasets,
-                all_dataset_outputs=all_dataset_outputs
-            )
-            
-            logger.info(f"Sending triangulation request for {len(datasets)} datasets")
-            
-            # Call LLM for triangulation
-            response = self.llm.invoke([HumanMessage(content=prompt)])
-            triangulated_result = response.content
-            
-            # Debug: Log the raw LLM output
-            logger.info(f"Raw LLM triangulation output: {triangulated_result}")
-            
-            # Parse the triangulated result into table format for export
-            triangulated_table = self._parse_triangulation_result(triangulated_result)
-            
-            # Debug: Log the parsed table
-            logger.info(f"Parsed triangulation table: {triangulated_table}")
-            
-            # Calculate processing time
-            processing_time = time.time() - start_time
-            
-            logger.info(f"Triangulation completed in {processing_time:.2f}s")
-            
-            # Return only the keys this function should update
-            return {
-                "triangulated_result": triangulated_result,
-                "triangulated_table": triangulated_table,
-                "current_step": "completed",
-                "progress_percentage": 100,
-                "logs": [f"Triangulation completed successfully in {processing_time:.2f}s"]
-            }
-            
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Error during triangulation: {error_msg}")
-            
-            # Return error state updates
-            return {
-                "current_step": "triangulation_failed",
-                "logs": [f"Triangulation failed: {error_msg}"]
-            }
-    
-    def _build_triangulation_prompt(self, product_name: str, datasets: List[Dict], all_dataset_outputs: Dict) -> str:
-        """Build triangulation prompt using multi-agent consensus and validation techniques with PNS priority"""
-        
-        # Build source information for reference
-        available_sources = [dataset["source"] for dataset in datasets]
-        source_list = ", ".join(available_sources)
-        
-        # Research-backed triangulation prompt with enhanced accuracy
-        prompt = f"""<role>
-You are a senior data triangulation specialist with expertise in multi-source B2B specification analysis. You excel at identifying patterns across diverse datasets and determining which specifications truly drive purchasing decisions for {product_name}.
+    def _dumps_sorted(data: Any) -> str:
+        """Serialize data as compact JSON with sorted keys (indentation only adds prompt tokens)"""
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+except ImportError:
+    def _dumps_sorted(data: Any) -> str:
+        """Serialize data as compact JSON with sorted keys (indentation only adds prompt tokens)"""
+        return json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+# Model and endpoint for every triangulation call, read once at import (app.py loads .env before importing agents)
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+# Agent statuses that count as done when deciding whether triangulation can start
+FINISHED_AGENT_STATUSES = frozenset({"completed", "failed", "excluded"})
+
+# Final rows whose spec name overlaps a CSV and a PNS spec at least this much (token Jaccard) skip LLM validation
+LOCAL_VALIDATION_MATCH = 0.6
+_SPEC_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_SPEC_OPTION_SPLIT_RE = re.compile(r',| / ')
+
+# Spec-name words that mean the same thing, mapped to one canonical token before names are compared
+SPEC_NAME_SYNONYMS = {
+    "colour": "color",
+    "wattage": "power",
+    "display": "screen",
+    "dimension": "size",
+    "dimensions": "size",
+}
+
+# Final triangulation result when either side is empty (matches the prompt's own no-consensus wording)
+NO_CONSENSUS_RESULT = "No consensus specifications identified"
+
+# Parsed tables keyed by (parser, hash of LLM output), so retries and reruns skip re-parsing
+PARSE_CACHE_MAX_ENTRIES = 512
+_PARSE_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
+# Opt-in cache of triangulation responses keyed by hash of (model, temperature, prompt); the default TTL of 0 disables it
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("TRIANGULATION_CACHE_TTL_SECONDS", "0"))
+RESPONSE_CACHE_MAX_ENTRIES = 128
+_RESPONSE_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+# Optional SQLite file that persists cached responses across restarts (empty = memory only)
+RESPONSE_CACHE_DB = os.getenv("TRIANGULATION_CACHE_DB", "")
+_response_db = None
+
+# Static instruction prefixes, kept byte-identical across calls so OpenAI prompt caching can reuse
+# them; everything that varies per request (data, source counts, product name) is appended after
+TRIANGULATION_PROMPT_PREFIX = """<role>
+You are a senior data triangulation specialist with expertise in multi-source B2B specification analysis. You excel at identifying patterns across diverse datasets and determining which specifications truly drive purchasing decisions for the product named in <context>.
 </role>
 
 <task>
-Analyze {len(datasets)} independent extraction results to identify the most critical {product_name} specifications through cross-validation and consensus building, with special priority given to PNS data as the most refined and authoritative source.
+Analyze the independent extraction results in <datasets_to_analyze>, one <dataset source="..."> block per source, to identify the most critical specifications of the product named in <context> through cross-validation and consensus building, with special priority given to PNS data as the most refined and authoritative source.
 </task>
 
 <strict_triangulation_methodology>
@@ -180,11 +96,10 @@ PHASE 1 - PNS PRIORITY ANALYSIS (HIGHEST PRIORITY):
 4. For PNS specs, use (PNS_frequency × 3) + (other_sources_frequency × 1) for ranking
 
 PHASE 2 - MULTI-DATASET PRIORITY (SECOND PRIORITY):
-1. Cross-reference all {len(datasets)} datasets: {source_list}
+1. Cross-reference all datasets listed in <available_sources>
 2. Identify specifications with semantic matches across 2+ datasets
 3. For each multi-dataset spec, count exact dataset coverage
 4. Rank by (dataset_count DESC, then weighted frequency DESC)
-5. Use PNS spec names when semantic matches are found
 
 PHASE 3 - EXCEPTIONAL SINGLE-DATASET (FALLBACK ONLY):
 1. Only if Phase 1 and 2 yield fewer than 4 high-quality specifications
@@ -196,7 +111,7 @@ PHASE 3 - EXCEPTIONAL SINGLE-DATASET (FALLBACK ONLY):
 CRITICAL ANALYSIS WORKFLOW:
 Step 1: Identify PNS specifications and their frequencies (3x weight)
 Step 2: Create cross-dataset specification matrix for non-PNS sources
-Step 3: Group specs by coverage: 4/{len(datasets)}, 3/{len(datasets)}, 2/{len(datasets)}, 1/{len(datasets)}
+Step 3: Group specs by coverage: 4/N, 3/N, 2/N, 1/N
 Step 4: Within each coverage group, rank by weighted frequency
 Step 5: Select from PNS first, then highest coverage groups
 Step 6: Only consider single-dataset specs if insufficient multi-dataset specs
@@ -206,28 +121,22 @@ SEMANTIC MATCHING RULES:
 • "Size" = "Grinding Size" = "Chamber Size" = "Dimensions"
 • "Capacity" = "Grinding Capacity" = "Output Capacity" = "Production Rate"
 • Use professional judgment for specification equivalence
-• When PNS has a spec name, use it as the canonical name for all sources
-
-CRITICAL: For each specification, track which sources mentioned it (semantically similar specs count as same source).
 
-For the triangulation, give me results and top specifications that came from these datasets. Don't give 
-the dataset itself in your response.
-Merge Semantically same Specification options and name. Duplicate Specifications name should not be 
-there. At least 2 options should be there to display any specification important and Specification name 
-and Specification options should not be same or contain same words as in {product_name}.
+For the triangulation, give me results and top specifications that came from these datasets. Don't give the dataset itself in your response.
+Merge Semantically same Specification options and name. Duplicate Specifications name should not be there. At least 2 options should be there to display any specification important and Specification name and Specification options should not be same or contain same words as in the product name.
 </strict_triangulation_methodology>
 
 <strict_validation_rules>
 PHASE 1 REQUIREMENTS (MANDATORY PRIORITY):
 ✓ MUST appear in 2+ sources (semantic matching allowed)
 ✓ Have at least 2 meaningful options (STRICTLY ENFORCED)
-✓ Directly influence {product_name} selection decisions
+✓ Directly influence selection decisions for the product
 ✓ Represent tangible, measurable product attributes
 
 PHASE 2 REQUIREMENTS (EXCEPTIONAL FALLBACK ONLY):
 ✓ Appears in only 1 source with exceptional frequency (top 10%)
 ✓ Have at least 2 meaningful options (STRICTLY ENFORCED)
-✓ CRITICAL impact on {product_name} purchasing decisions
+✓ CRITICAL impact on purchasing decisions for the product
 ✓ Cannot be found semantically in other datasets
 ✓ Only if Phase 1 yields insufficient specifications
 
@@ -257,7 +166,6 @@ STRICT ENFORCEMENT RULES:
 • Any PNS spec ALWAYS ranks higher than any non-PNS spec
 • Any multi-dataset spec ALWAYS ranks higher than any single-dataset spec
 • PNS priority CANNOT be overridden by frequency considerations
-• Use PNS spec names as canonical names when semantic matches found
 
 MANDATORY ORDERING EXAMPLE:
 - Motor Power (PNS spec, frequency 50) → Rank 1
@@ -265,32 +173,14 @@ MANDATORY ORDERING EXAMPLE:
 - Material (3/4 datasets, very high frequency) → Rank 3
 - Capacity (3/4 datasets, high frequency) → Rank 4
 - Phase (2/4 datasets, extremely high frequency) → Rank 5
-
-PNS PRIORITY RULES:
-• PNS specs appear FIRST in the final table
-• Use PNS specification names when semantic matches found
-• Combine all unique options from all sources for each spec
-• No restraints on number of options - include all unique options
-
-COMPLIANCE VERIFICATION:
-Before submitting, verify that your ranking follows this PNS-priority hierarchy.
 </strict_prioritization_rules>
 
-<available_sources>
-The following {len(datasets)} sources are available for analysis:
-{source_list}
-</available_sources>
-
-<datasets_to_analyze>
-{json.dumps(all_dataset_outputs, indent=2)}
-</datasets_to_analyze>
-
 <source_tracking_instructions>
 For each specification you include in the final table:
 1. Identify which sources mentioned this specification (semantically similar specs count)
 2. Count total sources that mentioned it
 3. List the specific source names that contributed
-4. Format as: X/{len(datasets)} (source1 / source2 / source3)
+4. Format as: X/N (source1 / source2 / source3), where N is the number of sources in <available_sources>
 
 Example source tracking:
 - If "Power Rating" appears in search_keywords and "Motor Power" appears in whatsapp_specs, count both as the same spec
@@ -307,13 +197,12 @@ Requirements for each row:
 2. Top Options: Combine all unique options from all sources (comma-separated)
 3. Why it matters: Concise business justification (buying behavior, compatibility, regulations)
 4. Impacts Pricing: "✅ Yes" or "❌ No" based on market analysis
-5. Sources: Format as X/{len(datasets)} (source1 / source2 / source3) showing which datasets mentioned this spec
+5. Sources: Format as X/N (source1 / source2 / source3) showing which datasets mentioned this spec
 
 CRITICAL INSTRUCTIONS:
 • ORDER specifications by PNS priority (PNS specs first), then dataset count: PNS → 4/4 → 3/4 → 2/4 → 1/4
 • Limit to 3-5 most impactful specifications
 • Use exact options from the data (don't invent new ones)
-• Combine all unique options from all sources for each spec
 • Focus on specifications that differentiate products
 • Keep explanations concise and business-oriented
 • MUST include accurate source tracking for each specification
@@ -330,82 +219,506 @@ CRITICAL INSTRUCTIONS:
 Before submitting, ensure:
 □ All options come directly from the provided datasets
 □ Specifications represent consensus across multiple sources
-□ Business justifications are specific to {product_name} market
+□ Business justifications are specific to the product's market
 □ Pricing impact assessment is logical and defensible
 □ Output matches the required table format exactly
-</final_validation>"""
+□ Ranking follows the PNS-priority hierarchy
+</final_validation>
+
+"""
+
+FINAL_TRIANGULATION_PROMPT_PREFIX = """<role>
+You are a final consensus specialist identifying specifications that are AGREED UPON by both CSV data sources and PNS expert analysis for the product named in <context>.
+</role>
+
+<task>
+Create the final CONSENSUS specification table showing ONLY specifications that appear in BOTH CSV and PNS data sources. This represents true market agreement.
+</task>
+
+<consensus_methodology>
+Apply this strict consensus process:
+
+STEP 1 - IDENTIFY OVERLAPS ONLY:
+• CSV Results: Frequency-based specifications from multiple data sources  
+• PNS Specs: Expert-validated specifications with frequency, status, and priority data
+• ONLY include specifications that exist in BOTH sources (semantic matching allowed)
+• Use PNS frequency and priority data to guide selection when multiple options exist
+
+STEP 2 - SEMANTIC MATCHING:
+• Match similar specifications: "Power" = "Motor Power" = "Power Rating"
+• Match similar specifications: "Size" = "Grinding Size" = "Chamber Size" 
+• Match similar specifications: "Capacity" = "Grinding Capacity" = "Output"
+• Use professional judgment for specification equivalence
+
+STEP 3 - CONSENSUS VALIDATION:
+• If a specification appears in both sources → INCLUDE IT
+• If a specification appears in only CSV → EXCLUDE IT  
+• If a specification appears in only PNS → EXCLUDE IT
+• Prefer PNS naming and option values for included specs
+
+STEP 4 - FINAL RANKING:
+• Rank consensus specs by: 1) PNS priority, 2) Combined frequency/confidence
+• If NO common specs found, return "No consensus specifications found"
+</consensus_methodology>
+
+<consensus_rules>
+STRICT INCLUSION CRITERIA:
+• Specification MUST appear semantically in both CSV and PNS data
+• ALWAYS use PNS specification names for consensus specs (PNS is pre-validated)
+• Use PNS option values when both sources cover the same specification
+• NO padding with unique specs from either source
+
+SEMANTIC MATCHING EXAMPLES:
+• "Power" (CSV) = "Motor Power" (PNS) → MATCH ✅
+• "Size" (CSV) = "Size" (PNS) → MATCH ✅  
+• "Capacity" (CSV) = "Grinding Capacity" (PNS) → MATCH ✅
+• "Material" (CSV only) → EXCLUDE ❌
+• "Phase" (PNS only) → EXCLUDE ❌
+</consensus_rules>
+
+<output_requirements>
+Create the consensus specification table with EXACTLY this format:
+
+| Specification Name | Top Options | Why it matters in the market | Impacts Pricing? |
+
+Requirements:
+1. Specification Name: Use PNS naming for matched specifications
+2. Top Options: Prefer PNS option values, supplement with CSV if needed
+3. Why it matters: Business justification for buyer decision-making  
+4. Impacts Pricing: "✅ Yes" or "❌ No" based on market analysis
+
+CRITICAL INSTRUCTIONS:
+• ONLY show specifications that exist in BOTH data sources
+• If only 1 consensus spec found, show only 1 row
+• If 0 consensus specs found, state "No consensus specifications identified"
+• Do NOT pad with unique specifications from either source
+• Prefer PNS values and naming conventions for consensus specs
+</output_requirements>
+
+<final_validation>
+Before submitting, ensure:
+□ ONLY specifications appearing in both CSV and PNS data are included
+□ If no common specifications exist, clearly state this
+□ PNS naming and option values are used for consensus specs
+□ Business justifications are specific to the product
+□ No padding with unique specifications from either source
+□ Output matches the required table format exactly
+</final_validation>
+
+"""
+
+VALIDATION_PROMPT_PREFIX = """<role>
+You are a validation specialist checking if a final triangulation result is correct. Your job is to verify that ONLY specifications present in BOTH sources are included, with ONLY common options.
+</role>
+
+<task>
+Validate this final triangulation result by checking each specification individually.
+</task>
+
+<validation_rules>
+For each specification in the final result:
+1. SEMANTIC MATCHING: The spec must exist in both CSV and PNS (names can differ but meaning should be similar)
+2. COMMON OPTIONS ONLY: All options in final result must be present in BOTH the matched CSV spec AND matched PNS spec
+3. PNS NAMING: Specification names should use PNS terminology (since PNS is pre-validated)
+4. NO EXTRA SPECS: No specifications that don't exist in both sources
+5. FREQUENCY CONSIDERATION: Higher frequency PNS options indicate greater market importance
+</validation_rules>
+
+<validation_instructions>
+For each specification in the final result, check:
+
+1. Exists in CSV: Does this specification exist semantically in CSV data?
+2. Exists in PNS: Does this specification exist semantically in PNS data?
+3. Options are common: Are the options in final result common to BOTH matched specs?
+4. Uses PNS naming: Is the specification name from PNS?
+</validation_instructions>
+
+<output_format>
+Return the verdict as the structured validation result:
+- is_valid: true only if every specification passes every check
+- error_summary: brief summary of any errors found (empty when valid)
+- errors: one entry per failed check, with spec_name as written in the final result, check set to the check's name above ("Exists in CSV", "Exists in PNS", "Options are common" or "Uses PNS naming") and explanation saying why it failed
+- correction_needed: what specific changes are needed (empty when valid)
+</output_format>
+
+"""
+
+RETRY_PROMPT_PREFIX = """<role>
+You are a final consensus specialist fixing errors in triangulation. Your previous attempt had validation errors that need to be corrected.
+</role>
+
+<task>
+Create a CORRECTED final consensus specification table showing ONLY specifications that appear in BOTH CSV and PNS data sources with ONLY common options.
+</task>
+
+<strict_consensus_rules>
+APPLY THESE RULES EXACTLY:
+
+STEP 1 - IDENTIFY SEMANTIC MATCHES ONLY:
+• Find specifications that exist in BOTH CSV and PNS (names can differ but meaning must be similar)
+• Use options overlap to confirm specs are the same (e.g., both have "KVA" values = power specs)
+
+STEP 2 - EXTRACT COMMON OPTIONS ONLY:
+• For each matched specification, find options that exist in BOTH the CSV spec AND the PNS spec
+• EXCLUDE options that exist in only one source
+
+STEP 3 - USE PNS NAMING AND PRIORITIZATION:
+• ALWAYS use the PNS specification name (since PNS is pre-validated)
+• Format options using PNS style when possible
+• Consider PNS frequency and priority data when selecting common options
+
+STEP 4 - STRICT VALIDATION:
+• If a specification doesn't have common options → EXCLUDE IT
+• If a specification exists in only one source → EXCLUDE IT
+• If no consensus specifications exist → State "No consensus specifications found"
+</strict_consensus_rules>
+
+<output_requirements>
+Create the corrected consensus specification table with EXACTLY this format:
+
+| Specification Name | Top Options | Why it matters in the market | Impacts Pricing? |
+
+CRITICAL REQUIREMENTS:
+• ONLY show specifications that exist semantically in BOTH sources
+• ONLY show options that exist in BOTH the matched CSV and PNS specifications
+• Use PNS specification names for matched specs
+• If no consensus specs exist after strict filtering, state "No consensus specifications identified"
+• Address ALL validation errors from your first attempt
+</output_requirements>
+
+<final_validation_check>
+Before submitting, verify:
+□ Each specification exists semantically in both CSV and PNS data
+□ Each option exists in both the matched CSV spec AND matched PNS spec
+□ Specification names use PNS terminology
+□ No specifications from only one source are included
+□ All validation errors from first attempt are fixed
+</final_validation_check>
+
+"""
+
+class SpecValidation(BaseModel):
+    """A single failed check for one specification in the final triangulation result"""
+    spec_name: str = Field(description="Specification name as it appears in the final result")
+    check: str = Field(description="Which check failed: Exists in CSV, Exists in PNS, Options are common or Uses PNS naming")
+    explanation: str = Field(description="Why the check failed")
+
+class ValidationResult(BaseModel):
+    """Structured verdict returned by the validation LLM call"""
+    is_valid: bool = Field(description="True only if every specification passes every check")
+    error_summary: str = Field(default="", description="Brief summary of any errors found")
+    errors: List[SpecValidation] = Field(default_factory=list, description="One entry per failed check")
+    correction_needed: str = Field(default="", description="What specific changes are needed")
+
+# COMMENTED OUT - MetaEnsembleAgent no longer used
+# class MetaEnsembleAgent:
+#     """Agent for performing final ensemble triangulation of multiple runs"""
+#     
+#     def __init__(self):
+#         self.llm = ChatOpenAI(
+#             model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
+#             temperature=0.1
+#         )
+#     
+#     def ensemble_triangulate(self, state: SpecExtractionState) -> SpecExtractionState:
+#         """Perform final ensemble triangulation of 3 run results"""
+#         start_time = time.time()
+#         
+#         try:
+#             logger.info("Starting meta-ensemble triangulation")
+#             
+#             run_results = state["run_results"]
+#             if len(run_results) != 3:
+#                 raise ValueError(f"Expected 3 run results, got {len(run_results)}")
+#             
+#             # Build ensemble prompt
+#             prompt = self._build_ensemble_prompt(
+#                 product_name=state["product_name"],
+#                 run_results=run_results
+#             )
+#             
+#             logger.info("Sending meta-ensemble triangulation request")
+#             
+#             # Call LLM for final ensemble
+#             response = self.llm.invoke([HumanMessage(content=prompt)])
+#             final_result = response.content
+#             
+#             # Parse the final result into table format
+#             final_table = self._parse_ensemble_result(final_result)
+#             
+#             # Calculate processing time
+#             processing_time = time.time() - start_time
+#             
+#             logger.info(f"Meta-ensemble triangulation completed in {processing_time:.2f}s")
+#             
+#             return {
+#                 "final_ensemble_result": final_result,
+#                 "final_ensemble_table": final_table,
+#                 "current_step": "meta_ensemble_completed",
+#                 "progress_percentage": 100,
+#                 "logs": [f"Meta-ensemble triangulation completed successfully in {processing_time:.2f}s"]
+#             }
+#             
+#         except Exception as e:
+#             error_msg = str(e)
+#             logger.error(f"Error during meta-ensemble triangulation: {error_msg}")
+#             
+#             return {
+#                 "current_step": "meta_ensemble_failed",
+#                 "logs": [f"Meta-ensemble triangulation failed: {error_msg}"]
+#             }
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(model: str, temperature: float, base_url: str) -> ChatOpenAI:
+    """Return the shared ChatOpenAI client for this configuration (thread-safe, so agents can share it)"""
+    return ChatOpenAI(model=model, temperature=temperature, base_url=base_url)
+
+def _get_response_db():
+    """Open the persistent response cache on first use; call with _RESPONSE_CACHE_LOCK held"""
+    global _response_db
+    if _response_db is None:
+        _response_db = sqlite3.connect(RESPONSE_CACHE_DB, check_same_thread=False)
+        _response_db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL, content TEXT)"
+        )
+    return _response_db
+
+def _response_cache_key(llm: ChatOpenAI, prompt: str, product_name: str) -> str:
+    """Hash the model settings and prompt, with the trailing product context normalized for case and spacing"""
+    # Both triangulation prompts end with the product context, their only product-name slot; the data stays exact
+    context = f"<context>\nProduct: {product_name}\n</context>"
+    if product_name and prompt.endswith(context):
+        normalized_name = " ".join(product_name.split()).casefold()
+        prompt = prompt[:-len(context)] + f"<context>\nProduct: {normalized_name}\n</context>"
+    
+    hasher = hashlib.blake2b(f"{llm.model_name}|{llm.temperature}|".encode("utf-8"), digest_size=16)
+    hasher.update(prompt.encode("utf-8"))
+    return hasher.hexdigest()
+
+def _invoke_text(llm: ChatOpenAI, prompt: str) -> str:
+    """Return the complete LLM response content for prompt"""
+    return llm.invoke([HumanMessage(content=prompt)]).content
+
+def _invoke_until_table_end(llm: ChatOpenAI, prompt: str) -> str:
+    """Stream the response and stop at the first non-blank line without a pipe once table rows have begun"""
+    response_lines = []
+    pending = ""
+    table_started = False
+    
+    for chunk in llm.stream([HumanMessage(content=prompt)]):
+        pending += chunk.content
+        if '\n' not in chunk.content:
+            continue
         
-        return prompt
+        # Check only the lines completed by this chunk, keep the partial tail buffered
+        *completed, pending = pending.split('\n')
+        for line in completed:
+            if not table_started:
+                table_started = bool(parse_triangulation_table_rows(line))
+            elif line.strip() and '|' not in line:
+                # Leaving the loop closes the stream, so trailing commentary is never generated or billed
+                logger.info("Triangulation table complete - stopping response stream early")
+                return "".join(response_lines).rstrip()
+            response_lines.append(line + '\n')
     
-    def _parse_triangulation_result(self, result: str) -> List[Dict[str, Any]]:
-        """Parse triangulation result into structured table format for export"""
+    return "".join(response_lines) + pending
+
+def _cached_invoke(llm: ChatOpenAI, prompt: str, product_name: str = "", table_only: bool = False) -> str:
+    """Return the LLM response content for prompt, reusing a cached response for an equivalent prompt"""
+    # A single-table response is only needed up to the end of its table
+    invoke = _invoke_until_table_end if table_only else _invoke_text
+    if RESPONSE_CACHE_TTL_SECONDS <= 0:
+        return invoke(llm, prompt)
+    
+    # Prompts embed the product name and sort_keys-serialised data, so equal inputs give equal keys
+    cache_key = _response_cache_key(llm, prompt, product_name)
+    
+    # Expiry uses wall-clock time so entries read back from disk stay valid across restarts
+    now = time.time()
+    with _RESPONSE_CACHE_LOCK:
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is None and RESPONSE_CACHE_DB:
+            try:
+                cached = _get_response_db().execute(
+                    "SELECT expires_at, content FROM responses WHERE key = ?", (cache_key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent triangulation cache read failed: {e}")
+            if cached is not None:
+                _RESPONSE_CACHE[cache_key] = cached = tuple(cached)
+        if cached is not None and cached[0] > now:
+            _RESPONSE_CACHE.move_to_end(cache_key)
+            logger.info(f"Reusing cached triangulation response ({cache_key[:8]})")
+            return cached[1]
+    
+    content = invoke(llm, prompt)
+    
+    # A truncated or tableless reply must not be replayed; only responses with table rows are stored
+    row_parser = parse_triangulation_table_rows if table_only else parse_final_table_rows
+    if not row_parser(content):
+        logger.info(f"Not caching triangulation response without table rows ({cache_key[:8]})")
+        return content
+    
+    expires_at = now + RESPONSE_CACHE_TTL_SECONDS
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[cache_key] = (expires_at, content)
+        _RESPONSE_CACHE.move_to_end(cache_key)
+        while len(_RESPONSE_CACHE) > RESPONSE_CACHE_MAX_ENTRIES:
+            _RESPONSE_CACHE.popitem(last=False)
+        if RESPONSE_CACHE_DB:
+            try:
+                with _get_response_db() as db:
+                    db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                    db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (cache_key, expires_at, content))
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent triangulation cache write failed: {e}")
+    return content
+
+def _cached_parse(kind: str, result: str, parse: Callable[[str], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Return parse(result) from the LRU cache when the same output was parsed before"""
+    cache_key = (kind, hashlib.blake2b(result.encode("utf-8"), digest_size=16).digest())
+    with _PARSE_CACHE_LOCK:
+        cached_rows = _PARSE_CACHE.get(cache_key)
+        if cached_rows is not None:
+            _PARSE_CACHE.move_to_end(cache_key)
+    
+    if cached_rows is None:
+        cached_rows = tuple(parse(result))
+        with _PARSE_CACHE_LOCK:
+            _PARSE_CACHE[cache_key] = cached_rows
+            while len(_PARSE_CACHE) > PARSE_CACHE_MAX_ENTRIES:
+                _PARSE_CACHE.popitem(last=False)
+    else:
+        logger.info(f"Reusing cached {kind} parse for identical LLM output")
+    
+    # Rows are flat dicts; hand out copies so callers cannot mutate the cached table
+    return [dict(row) for row in cached_rows]
+
+class TriangulationAgent:
+    """Agent for triangulating results from all sources"""
+    
+    def __init__(self):
+        self.llm = _get_llm(OPENAI_MODEL, 0.1, OPENAI_BASE_URL)
+    
+    def triangulate_results(self, state: SpecExtractionState) -> SpecExtractionState:
+        """Triangulate results from all completed agents"""
+        start_time = time.time()
+        
         try:
-            lines = result.strip().split('\n')
-            table_data = []
-            rank = 1
+            logger.info("Starting triangulation process")
             
-            # Debug: log each line being processed
-            logger.info(f"Processing {len(lines)} lines for parsing")
+            all_dataset_outputs = self._completed_dataset_outputs(state)
             
-            # Look for table format in the result
-            for i, line in enumerate(lines):
-                line = line.strip()
-                
-                # Debug: log the line being processed
-                logger.info(f"Line {i}: '{line}' - Pipe count: {line.count('|')}")
-                
-                # Skip empty lines, headers, and separator lines
-                if not line:
-                    continue
-                if 'Specification Name' in line:
-                    continue
-                if line.startswith('|--') or line.startswith('|-'):
-                    continue
-                if line.count('|') < 3:
-                    continue
-                
-                # Look for table rows (containing | separator)
-                if '|' in line:
-                    # Clean up the line
-                    cleaned_line = line
-                    if cleaned_line.startswith('|'):
-                        cleaned_line = cleaned_line[1:]
-                    if cleaned_line.endswith('|'):
-                        cleaned_line = cleaned_line[:-1]
-                    
-                    parts = [part.strip() for part in cleaned_line.split('|')]
-                    
-                    # Debug: log the parts
-                    logger.info(f"Parsed parts: {parts} (count: {len(parts)})")
-                    
-                    # Ensure we have at least 5 parts (spec, options, why, pricing, sources)
-                    if len(parts) >= 5:
-                        # Map to updated format with Sources column
-                        table_data.append({
-                            'Rank': rank,
-                            'Specification': parts[0],  # Changed from 'Specification Name'
-                            'Top Options': parts[1].replace('(based on data)', '').strip(),  # Remove "(based on data)"
-                            'Why it matters': parts[2].replace('in the market', '').strip(),  # Remove "in the market"
-                            'Impacts Pricing?': parts[3],  # Changed to include question mark
-                            'Sources': parts[4].strip()  # New Sources column
-                        })
-                        rank += 1
-                        logger.info(f"Successfully added row {rank-1}: {parts[0]} with sources: {parts[4].strip()}")
-                    # Fallback for old 4-column format (backward compatibility)
-                    elif len(parts) >= 4:
-                        table_data.append({
-                            'Rank': rank,
-                            'Specification': parts[0],
-                            'Top Options': parts[1].replace('(based on data)', '').strip(),
-                            'Why it matters': parts[2].replace('in the market', '').strip(),
-                            'Impacts Pricing?': parts[3],
-                            'Sources': 'N/A'  # Default value for backward compatibility
-                        })
-                        rank += 1
-                        logger.info(f"Successfully added row {rank-1} (fallback): {parts[0]}")
+            # Build triangulation prompt using multi-agent consensus and validation techniques
+            prompt = self._build_triangulation_prompt(
+                product_name=state["product_name"],
+                all_dataset_outputs=all_dataset_outputs
+            )
+            
+            logger.info(f"Sending triangulation request for {len(all_dataset_outputs)} datasets")
+            
+            # Call LLM for triangulation
+            triangulated_result = _cached_invoke(self.llm, prompt, state["product_name"], table_only=True)
+            
+            # Debug: Log the raw LLM output
+            logger.debug("Raw LLM triangulation output: %s", triangulated_result)
+            
+            # Parse the triangulated result into table format for export
+            triangulated_table = self._parse_triangulation_result(triangulated_result)
+            
+            # Debug: Log the parsed table
+            logger.debug("Parsed triangulation table: %s", triangulated_table)
+            
+            # Calculate processing time
+            processing_time = time.time() - start_time
+            
+            logger.info(f"Triangulation completed in {processing_time:.2f}s")
+            
+            # Return only the keys this function should update
+            return {
+                "triangulated_result": triangulated_result,
+                "triangulated_table": triangulated_table,
+                "current_step": "completed",
+                "progress_percentage": 100,
+                "logs": [f"Triangulation completed successfully in {processing_time:.2f}s"]
+            }
+            
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Error during triangulation: {error_msg}")
+            
+            # Return error state updates
+            return {
+                "current_step": "triangulation_failed",
+                "logs": [f"Triangulation failed: {error_msg}"]
+            }
+    
+    def _completed_dataset_outputs(self, state: SpecExtractionState) -> Dict[str, Any]:
+        """Collect extracted specs of the completed agents by source, raising ValueError when none completed"""
+        # Get all completed agent results using helper function
+        agent_results = get_agent_results(state)
+        
+        # The source names in the prompt come from this dict's keys
+        all_dataset_outputs = {
+            source: result["extracted_specs"] for source, result in agent_results.items()
+            if result.get("status") == "completed"
+        }
+        
+        if not all_dataset_outputs:
+            raise ValueError("No completed agent results to triangulate")
+        return all_dataset_outputs
+    
+    def _build_triangulation_prompt(self, product_name: str, all_dataset_outputs: Dict) -> str:
+        """Build triangulation prompt using multi-agent consensus and validation techniques with PNS priority"""
+        # Research-backed triangulation prompt with enhanced accuracy
+        return TRIANGULATION_PROMPT_PREFIX + self._build_product_sections(product_name, all_dataset_outputs)
+    
+    def _build_product_sections(self, product_name: str, all_dataset_outputs: Dict) -> str:
+        """Build the per-product sources, datasets and context sections that follow the static prefix"""
+        # Build source information for reference
+        source_list = ", ".join(all_dataset_outputs)
+        
+        return f"""<available_sources>
+The following {len(all_dataset_outputs)} sources are available for analysis:
+{source_list}
+</available_sources>
+
+<datasets_to_analyze>
+{self._format_datasets(all_dataset_outputs)}
+</datasets_to_analyze>
+
+<context>
+Product: {product_name}
+</context>"""
+    
+    def _format_datasets(self, all_dataset_outputs: Dict) -> str:
+        """Render each source's extraction as its own <dataset> block, in sorted source order"""
+        # Extractions are text tables; embedding them raw avoids the escaped newlines and quotes of a JSON string
+        return "\n".join(
+            f'<dataset source="{source}">\n'
+            f'{output.strip() if isinstance(output, str) else _dumps_sorted(output)}\n'
+            f'</dataset>'
+            for source, output in sorted(all_dataset_outputs.items())
+        )
+    
+    def _parse_triangulation_result(self, result: str) -> List[Dict[str, Any]]:
+        """Parse triangulation result into structured table format for export, cached by output hash"""
+        return _cached_parse("triangulation", result, self._parse_triangulation_table)
+    
+    def _parse_triangulation_table(self, result: str) -> List[Dict[str, Any]]:
+        """Parse triangulation result into structured table format for export"""
+        try:
+            # Per-row logging is DEBUG-only; check the level once so disabled logs cost nothing
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            
+            # One regex pass over the table lines; short rows get Sources 'N/A'
+            table_data = parse_triangulation_table_rows(result)
             
-            # Debug log
-            logger.info(f"Successfully parsed {len(table_data)} table rows")
+            # Only an empty table is worth an INFO line; row counts are debug detail
+            if table_data:
+                logger.debug("Successfully parsed %d table rows", len(table_data))
+            else:
+                logger.info("No table rows found in triangulation result")
             
             # NEW: Filter out specs with only 1 option and validate multi-dataset priority
             if table_data:
@@ -427,7 +740,8 @@ Before submitting, ensure:
                 for new_rank, (dataset_count, item) in enumerate(table_data_with_counts, 1):
                     item['Rank'] = new_rank
                     sorted_table_data.append(item)
-                    logger.info(f"Prioritized: Rank {new_rank} - '{item['Specification']}' (appears in {dataset_count} datasets)")
+                    if debug_enabled:
+                        logger.debug("Prioritized: Rank %d - '%s' (appears in %d datasets)", new_rank, item['Specification'], dataset_count)
                 
                 logger.info(f"Dataset count prioritization completed - {len(sorted_table_data)} specs reordered")
                 return sorted_table_data
@@ -456,11 +770,11 @@ Before submitting, ensure:
             if '/' in sources_column:
                 count_part = sources_column.split('/')[0].strip()
                 dataset_count = int(count_part)
-                logger.debug(f"Extracted dataset count {dataset_count} from sources: '{sources_column}'")
+                logger.debug("Extracted dataset count %d from sources: '%s'", dataset_count, sources_column)
                 return dataset_count
             else:
                 # Fallback: if no "/" found, assume 1 dataset
-                logger.debug(f"No '/' found in sources '{sources_column}', assuming 1 dataset")
+                logger.debug("No '/' found in sources '%s', assuming 1 dataset", sources_column)
                 return 1
                 
         except (ValueError, AttributeError) as e:
@@ -480,7 +794,7 @@ Before submitting, ensure:
             
             if option_count < 2:
                 excluded_single_option.append(item)
-                logger.info(f"Excluded '{item['Specification']}' - only {option_count} option(s): {options}")
+                logger.debug("Excluded '%s' - only %d option(s): %s", item['Specification'], option_count, options)
                 continue
             
             # Filter 2: Validate dataset coverage (warn about single-dataset specs)
@@ -490,7 +804,7 @@ Before submitting, ensure:
                 logger.warning(f"Single-dataset spec detected: '{item['Specification']}' - should be exceptional case only")
             
             filtered_specs.append(item)
-            logger.info(f"Included '{item['Specification']}' with {option_count} options from {dataset_count} datasets")
+            logger.debug("Included '%s' with %d options from %d datasets", item['Specification'], option_count, dataset_count)
         
         # Log filtering results
         if excluded_single_option:
@@ -527,11 +841,28 @@ Before submitting, ensure:
             return True
 
 
+# Agents reused by the LangGraph node functions, so every run shares one ChatOpenAI and its connection pool
+_NODE_AGENTS: Dict[type, Any] = {}
+_NODE_AGENTS_LOCK = threading.Lock()
+
+def _node_agent(agent_cls: type) -> Any:
+    """Return the process-wide agent instance used by the LangGraph nodes, creating it on first use"""
+    with _NODE_AGENTS_LOCK:
+        agent = _NODE_AGENTS.get(agent_cls)
+        if agent is None:
+            agent = _NODE_AGENTS[agent_cls] = agent_cls()
+        return agent
+
 def triangulate_all_results(state: SpecExtractionState) -> SpecExtractionState:
     """LangGraph node function for triangulation"""
-    agent = TriangulationAgent()
+    agent = _node_agent(TriangulationAgent)
     return agent.triangulate_results(state)
 
+async def atriangulate_all_results(state: SpecExtractionState) -> SpecExtractionState:
+    """Async LangGraph node function for triangulation that keeps the event loop free during the LLM call"""
+    # The sync node already handles caching and early stream exit; a worker thread reuses all of it
+    return await asyncio.to_thread(triangulate_all_results, state)
+
 # COMMENTED OUT - Meta-ensemble triangulation no longer used
 # def meta_ensemble_triangulate(state: SpecExtractionState) -> SpecExtractionState:
 #     """LangGraph node function for meta-ensemble triangulation"""
@@ -542,11 +873,8 @@ class FinalTriangulationAgent:
     """Agent for performing final triangulation between CSV results and PNS specs"""
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
-            temperature=0.1,
-            base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
-        )
+        self.llm = _get_llm(OPENAI_MODEL, 0.1, OPENAI_BASE_URL)
+        self.validation_llm = self.llm.with_structured_output(ValidationResult, include_raw=True)
     
     def final_triangulate(self, state: SpecExtractionState) -> SpecExtractionState:
         """Perform final triangulation between CSV triangulated result and PNS specs with validation"""
@@ -561,6 +889,21 @@ class FinalTriangulationAgent:
             if not csv_result and not pns_specs:
                 raise ValueError("No data available for final triangulation")
             
+            # Consensus needs both sides, so a missing side cannot produce any rows - skip the LLM call
+            if not csv_result or not pns_specs:
+                missing_side = "CSV triangulation result" if not csv_result else "PNS specs"
+                logger.info(f"Skipping final triangulation LLM call: no {missing_side} to build consensus with")
+                return {
+                    "final_triangulated_result": NO_CONSENSUS_RESULT,
+                    "final_triangulated_table": [],
+                    "current_step": "final_triangulation_completed",
+                    "progress_percentage": 100,
+                    "logs": [f"Final triangulation skipped: no {missing_side} available, so no consensus specifications"]
+                }
+            
+            # Merge near-duplicate PNS specs once so every prompt carries the smaller list
+            pns_specs = self._dedupe_pns(pns_specs)
+            
             # Attempt final triangulation with validation and single retry
             final_result, final_table, processing_logs = self._triangulate_with_validation(
                 product_name=state["product_name"],
@@ -598,17 +941,26 @@ class FinalTriangulationAgent:
         logger.info("First triangulation attempt")
         processing_logs.append("Starting final triangulation (1st attempt)")
         
-        prompt = self._build_final_triangulation_prompt(product_name, csv_result, pns_specs)
-        response = self.llm.invoke([HumanMessage(content=prompt)])
-        final_result = response.content
+        # Parse and render both sources once; the final, validation and retry prompts all embed them
+        csv_structured = self._parse_csv_to_structured_format(csv_result)
+        pns_structured = self._parse_pns_to_structured_format(pns_specs)
+        source_sections = self._render_source_sections(csv_structured, pns_structured)
+        
+        prompt = self._build_final_triangulation_prompt(product_name, csv_result, pns_specs, source_sections)
+        final_result = _cached_invoke(self.llm, prompt, product_name)
         final_table = self._parse_final_triangulation_result(final_result)
         
         # Validate the result
         logger.info("Validating triangulation result")
         processing_logs.append("Validating triangulation result")
         
-        validation_result = self._validate_final_result(final_result, csv_result, pns_specs, product_name)
-        logger.debug(f"Validation result: {validation_result}")
+        # Rows that clearly match both sources need no LLM verdict; anything less certain goes to the validator
+        validation_result = self._local_validate(final_table, csv_structured, pns_structured)
+        if validation_result is None:
+            validation_result = self._validate_final_result(final_result, csv_result, pns_specs, product_name, source_sections)
+        else:
+            logger.info("Local validation matched every row to both sources - skipping LLM validation")
+        logger.debug("Validation result: %s", validation_result)
         
         if validation_result["is_valid"]:
             logger.info("Validation passed - using first attempt result")
@@ -622,7 +974,8 @@ class FinalTriangulationAgent:
         retry_prompt = self._build_retry_prompt(
             product_name, csv_result, pns_specs, 
             first_attempt=final_result, 
-            validation_errors=validation_result['errors']
+            validation_errors=validation_result['errors'],
+            source_sections=source_sections
         )
         
         try:
@@ -642,115 +995,99 @@ class FinalTriangulationAgent:
             # Return original result if retry fails
             return final_result, final_table, processing_logs
     
-    def _build_final_triangulation_prompt(self, product_name: str, csv_result: str, pns_specs: List[Dict[str, Any]]) -> str:
-        """Build prompt for final triangulation between CSV and PNS data"""
+    def _dedupe_pns(self, pns_specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Merge PNS specs whose names have the same canonical tokens into the first one, keeping input order"""
+        merged_specs = []
+        merged_index = {}
         
-        # Convert both sources to standardized format for consistent LLM processing
-        csv_structured = self._parse_csv_to_structured_format(csv_result)
-        pns_structured = self._parse_pns_to_structured_format(pns_specs)
+        for spec in pns_specs:
+            # Only identical token sets (after synonym mapping) merge; "Voltage (V)" and "Voltage (kV)" stay apart
+            key = self._spec_name_tokens(str(spec.get("spec_name", "")))
+            match = merged_index.get(key) if key else None
+            if match is None:
+                if key:
+                    merged_index[key] = len(merged_specs)
+                merged_specs.append(dict(spec))
+                continue
+            
+            kept = merged_specs[match]
+            logger.info(f"Merging duplicate PNS spec '{spec.get('spec_name')}' into '{kept.get('spec_name')}'")
+            
+            # Options, frequencies and statuses are parallel ' / ' lists; append only unseen options
+            options = kept.get("option", "").split(" / ")
+            frequencies = kept.get("frequency", "").split(" (Total:")[0].split(" / ")
+            statuses = kept.get("spec_status", "").split(" / ")
+            seen = {option.lower() for option in options}
+            extra_options = spec.get("option", "").split(" / ")
+            extra_frequencies = spec.get("frequency", "").split(" (Total:")[0].split(" / ")
+            extra_statuses = spec.get("spec_status", "").split(" / ")
+            
+            # Align frequency/status lists to the options (N/A-padded) so appended entries stay paired
+            frequencies = (frequencies + ["N/A"] * len(options))[:len(options)]
+            statuses = (statuses + ["N/A"] * len(options))[:len(options)]
+            for option, frequency, status in itertools.zip_longest(extra_options, extra_frequencies, extra_statuses):
+                if option is None or option.lower() in seen:
+                    continue
+                seen.add(option.lower())
+                options.append(option)
+                frequencies.append(frequency or "N/A")
+                statuses.append(status or "N/A")
+            
+            kept["total_frequency"] = kept.get("total_frequency", 0) + spec.get("total_frequency", 0)
+            kept["option"] = " / ".join(options)
+            kept["frequency"] = f"{' / '.join(frequencies)} (Total: {kept['total_frequency']})"
+            kept["spec_status"] = " / ".join(statuses)
+        
+        if len(merged_specs) < len(pns_specs):
+            logger.info(f"Deduplicated PNS specs from {len(pns_specs)} to {len(merged_specs)}")
         
+        return merged_specs
+    
+    def _format_source_sections(self, csv_result: str, pns_specs: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Render CSV and PNS specs as the numbered source sections shared by the final, validation and retry prompts"""
+        # Convert both sources to standardized format for consistent LLM processing
+        return self._render_source_sections(
+            self._parse_csv_to_structured_format(csv_result),
+            self._parse_pns_to_structured_format(pns_specs)
+        )
+    
+    def _render_source_sections(self, csv_structured: List[Dict[str, str]], pns_structured: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """Render already structured CSV and PNS specs as the numbered source sections"""
         # Prepare standardized CSV data
-        csv_data = "\n=== CSV TRIANGULATED SPECIFICATIONS ===\n"
-        if csv_structured:
-            for i, spec in enumerate(csv_structured, 1):
-                csv_data += f"{i}. Spec: {spec['name']} | Options: {spec['options']} | Source: CSV\n"
-        else:
-            csv_data += "No CSV specifications available\n"
+        csv_lines = [
+            f"{i}. Spec: {spec['name']} | Options: {spec['options']} | Source: CSV\n"
+            for i, spec in enumerate(csv_structured, 1)
+        ] or ["No CSV specifications available\n"]
+        csv_data = "\n=== CSV TRIANGULATED SPECIFICATIONS ===\n" + "".join(csv_lines)
         
         # Prepare standardized PNS data
-        pns_data = "\n=== PNS EXTRACTED SPECIFICATIONS ===\n"
-        if pns_structured:
-            for i, spec in enumerate(pns_structured, 1):
-                pns_data += f"{i}. Spec: {spec['name']} | Options: {spec['options']} | Freq: {spec['frequency']} | Status: {spec['status']} | Priority: {spec['priority']} | Source: PNS\n"
-        else:
-            pns_data += "No PNS specifications available\n"
+        pns_lines = [
+            f"{i}. Spec: {spec['name']} | Options: {spec['options']} | Freq: {spec['frequency']} | Status: {spec['status']} | Priority: {spec['priority']} | Source: PNS\n"
+            for i, spec in enumerate(pns_structured, 1)
+        ] or ["No PNS specifications available\n"]
+        pns_data = "\n=== PNS EXTRACTED SPECIFICATIONS ===\n" + "".join(pns_lines)
         
-        prompt = f"""<role>
-You are a final consensus specialist identifying specifications that are AGREED UPON by both CSV data sources and PNS expert analysis for {product_name}.
-</role>
-
-<task>
-Create the final CONSENSUS specification table showing ONLY specifications that appear in BOTH CSV and PNS data sources. This represents true market agreement.
-</task>
-
-<consensus_methodology>
-Apply this strict consensus process:
-
-STEP 1 - IDENTIFY OVERLAPS ONLY:
-• CSV Results: Frequency-based specifications from multiple data sources  
-• PNS Specs: Expert-validated specifications with frequency, status, and priority data
-• ONLY include specifications that exist in BOTH sources (semantic matching allowed)
-• Use PNS frequency and priority data to guide selection when multiple options exist
-
-STEP 2 - SEMANTIC MATCHING:
-• Match similar specifications: "Power" = "Motor Power" = "Power Rating"
-• Match similar specifications: "Size" = "Grinding Size" = "Chamber Size" 
-• Match similar specifications: "Capacity" = "Grinding Capacity" = "Output"
-• Use professional judgment for specification equivalence
-
-STEP 3 - CONSENSUS VALIDATION:
-• If a specification appears in both sources → INCLUDE IT
-• If a specification appears in only CSV → EXCLUDE IT  
-• If a specification appears in only PNS → EXCLUDE IT
-• Prefer PNS naming and option values for included specs
-
-STEP 4 - FINAL RANKING:
-• Rank consensus specs by: 1) PNS priority, 2) Combined frequency/confidence
-• If NO common specs found, return "No consensus specifications found"
-</consensus_methodology>
-
-<data_sources>
+        return csv_data, pns_data
+    
+    def _build_final_triangulation_prompt(self, product_name: str, csv_result: str, pns_specs: List[Dict[str, Any]],
+                                          source_sections: Optional[Tuple[str, str]] = None) -> str:
+        """Build prompt for final triangulation between CSV and PNS data"""
+        # Reuse the rendered source sections when the caller already built them for another prompt
+        csv_data, pns_data = source_sections or self._format_source_sections(csv_result, pns_specs)
+        
+        prompt = FINAL_TRIANGULATION_PROMPT_PREFIX + f"""<data_sources>
 {csv_data}
 {pns_data}
 </data_sources>
 
-<consensus_rules>
-STRICT INCLUSION CRITERIA:
-• Specification MUST appear semantically in both CSV and PNS data
-• ALWAYS use PNS specification names for consensus specs (PNS is pre-validated)
-• Use PNS option values when both sources cover the same specification
-• NO padding with unique specs from either source
-
-SEMANTIC MATCHING EXAMPLES:
-• "Power" (CSV) = "Motor Power" (PNS) → MATCH ✅
-• "Size" (CSV) = "Size" (PNS) → MATCH ✅  
-• "Capacity" (CSV) = "Grinding Capacity" (PNS) → MATCH ✅
-• "Material" (CSV only) → EXCLUDE ❌
-• "Phase" (PNS only) → EXCLUDE ❌
-</consensus_rules>
-
-<output_requirements>
-Create the consensus specification table with EXACTLY this format:
-
-| Specification Name | Top Options | Why it matters in the market | Impacts Pricing? |
-
-Requirements:
-1. Specification Name: Use PNS naming for matched specifications
-2. Top Options: Prefer PNS option values, supplement with CSV if needed
-3. Why it matters: Business justification for buyer decision-making  
-4. Impacts Pricing: "✅ Yes" or "❌ No" based on market analysis
-
-CRITICAL INSTRUCTIONS:
-• ONLY show specifications that exist in BOTH data sources
-• If only 1 consensus spec found, show only 1 row
-• If 0 consensus specs found, state "No consensus specifications identified"
-• Do NOT pad with unique specifications from either source
-• Prefer PNS values and naming conventions for consensus specs
-</output_requirements>
-
-<final_validation>
-Before submitting, ensure:
-□ ONLY specifications appearing in both CSV and PNS data are included
-□ If no common specifications exist, clearly state this
-□ PNS naming and option values are used for consensus specs
-□ Business justifications are specific to {product_name}
-□ No padding with unique specifications from either source
-□ Output matches the required table format exactly
-</final_validation>"""
+<context>
+Product: {product_name}
+</context>"""
         
         return prompt
     
-    def _validate_final_result(self, final_result: str, csv_result: str, pns_specs: List[Dict[str, Any]], product_name: str) -> Dict[str, Any]:
+    def _validate_final_result(self, final_result: str, csv_result: str, pns_specs: List[Dict[str, Any]], product_name: str,
+                               source_sections: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
         """
         Validate final triangulation result to ensure only common specs with common options.
         
@@ -764,222 +1101,141 @@ Before submitting, ensure:
         """
         
         # Build validation prompt
-        validation_prompt = self._build_validation_prompt(final_result, csv_result, pns_specs, product_name)
+        validation_prompt = self._build_validation_prompt(final_result, csv_result, pns_specs, product_name, source_sections)
         
         logger.info("Sending validation request to LLM")
         
-        # Get validation response
-        response = self.llm.invoke([HumanMessage(content=validation_prompt)])
-        validation_response = response.content
+        # Ask for the verdict as a schema-validated object so no free-text parsing is needed
+        response = self.validation_llm.invoke([HumanMessage(content=validation_prompt)])
+        if response["parsed"] is not None:
+            return self._validation_result_to_dict(response["parsed"])
         
-        # Parse validation response
-        return self._parse_validation_response(validation_response)
+        # Read a reply that missed the schema locally rather than paying for a second call
+        raw_response = str(response["raw"].content)
+        logger.warning(f"Structured validation output could not be parsed ({response['parsing_error']}), reading the raw reply")
+        try:
+            return self._validation_result_to_dict(ValidationResult.model_validate_json(raw_response))
+        except ValidationError:
+            return self._parse_validation_response(raw_response)
     
-    def _build_validation_prompt(self, final_result: str, csv_result: str, pns_specs: List[Dict[str, Any]], product_name: str) -> str:
-        """Build validation prompt for checking final triangulation result"""
+    def _local_validate(self, final_table: List[Dict[str, Any]], csv_structured: List[Dict[str, str]],
+                        pns_structured: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Pass the final table without an LLM call when every row clearly matches both sources, else return None"""
+        # An empty table is the worst possible output, never an obviously valid one
+        if not final_table:
+            return None
         
-        # Convert both sources to standardized format for easier LLM comparison
-        csv_structured = self._parse_csv_to_structured_format(csv_result)
-        pns_structured = self._parse_pns_to_structured_format(pns_specs)
+        # Tokenize each source spec name once; every final row is matched against the same index
+        csv_index = self._spec_token_index(csv_structured)
+        pns_index = self._spec_token_index(pns_structured)
         
-        # Prepare standardized CSV data
-        csv_data = "\n=== CSV TRIANGULATED SPECIFICATIONS ===\n"
-        if csv_structured:
-            for i, spec in enumerate(csv_structured, 1):
-                csv_data += f"{i}. Spec: {spec['name']} | Options: {spec['options']} | Source: CSV\n"
-        else:
-            csv_data += "No CSV specifications available\n"
+        for row in final_table:
+            tokens = self._spec_name_tokens(row.get('Specification', ''))
+            csv_match = self._best_spec_match(tokens, csv_index)
+            # The final table must use PNS terminology, so only an exact (synonym-mapped) PNS name passes locally
+            pns_match = self._best_spec_match(tokens, pns_index, exact=True)
+            if csv_match is None or pns_match is None:
+                return None
+            
+            # Every listed option must be a whole option of both matched specs, not just a run of their tokens
+            options = self._spec_option_set(row.get('Top Options', ''))
+            if not options or not options <= self._spec_option_set(str(csv_match.get('options', ''))) \
+                    or not options <= self._spec_option_set(str(pns_match.get('options', ''))):
+                return None
         
-        # Prepare standardized PNS data  
-        pns_data = "\n=== PNS EXTRACTED SPECIFICATIONS ===\n"
-        if pns_structured:
-            for i, spec in enumerate(pns_structured, 1):
-                pns_data += f"{i}. Spec: {spec['name']} | Options: {spec['options']} | Freq: {spec['frequency']} | Status: {spec['status']} | Priority: {spec['priority']} | Source: PNS\n"
-        else:
-            pns_data += "No PNS specifications available\n"
+        return {
+            "is_valid": True,
+            "summary": "No errors found",
+            "errors": [],
+            "correction_needed": "",
+            "raw_response": f"Local validation: {len(final_table)} rows matched both sources"
+        }
+    
+    def _spec_token_index(self, structured_specs: List[Dict[str, Any]]) -> List[Tuple[frozenset, Dict[str, Any]]]:
+        """Pair each structured spec with its canonical name tokens, dropping specs whose name has none"""
+        index = []
+        for spec in structured_specs:
+            tokens = self._spec_name_tokens(str(spec.get('name', '')))
+            if tokens:
+                index.append((tokens, spec))
+        return index
+    
+    def _spec_name_tokens(self, spec_name: str) -> frozenset:
+        """Return the casefolded alphanumeric tokens of a spec name with synonyms mapped to one canonical token"""
+        return frozenset(SPEC_NAME_SYNONYMS.get(token, token) for token in _SPEC_TOKEN_RE.findall(spec_name.casefold()))
+    
+    def _best_spec_match(self, tokens: frozenset, spec_index: List[Tuple[frozenset, Dict[str, Any]]],
+                         exact: bool = False) -> Optional[Dict[str, Any]]:
+        """Return the indexed spec whose name best overlaps tokens (exact: has the same tokens), or None when no match is clear"""
+        if not tokens:
+            return None
         
-        prompt = f"""<role>
-You are a validation specialist checking if a final triangulation result is correct. Your job is to verify that ONLY specifications present in BOTH sources are included, with ONLY common options.
-</role>
-
-<task>
-Validate this final triangulation result by checking each specification individually.
-</task>
-
-<validation_rules>
-For each specification in the final result:
-1. SEMANTIC MATCHING: The spec must exist in both CSV and PNS (names can differ but meaning should be similar)
-2. COMMON OPTIONS ONLY: All options in final result must be present in BOTH the matched CSV spec AND matched PNS spec
-3. PNS NAMING: Specification names should use PNS terminology (since PNS is pre-validated)
-4. NO EXTRA SPECS: No specifications that don't exist in both sources
-5. FREQUENCY CONSIDERATION: Higher frequency PNS options indicate greater market importance
-</validation_rules>
-
-<original_sources>
+        best_specs, best_score = [], 0.0
+        for other_tokens, spec in spec_index:
+            if tokens == other_tokens:
+                return spec
+            if exact:
+                continue
+            
+            # Anything below the bar, including a bare subset like "RAM" in "RAM Size", is ambiguous and left to the LLM
+            score = len(tokens & other_tokens) / len(tokens | other_tokens)
+            if score < LOCAL_VALIDATION_MATCH:
+                continue
+            if score > best_score:
+                best_specs, best_score = [spec], score
+            elif score == best_score:
+                best_specs.append(spec)
+        
+        # A tie (e.g. "Power" against "Input Power" and "Output Power") is left to the LLM
+        return best_specs[0] if len(best_specs) == 1 else None
+    
+    def _spec_option_set(self, options: str) -> frozenset:
+        """Split an options list on ',' and ' / ' into its normalized whole options"""
+        return frozenset(filter(None, (self._normalize_spec_text(option) for option in _SPEC_OPTION_SPLIT_RE.split(options))))
+    
+    def _normalize_spec_text(self, text: str) -> str:
+        """Reduce text to its casefolded alphanumeric tokens so options compare loosely"""
+        return " ".join(_SPEC_TOKEN_RE.findall(text.casefold()))
+    
+    def _validation_result_to_dict(self, result: ValidationResult) -> Dict[str, Any]:
+        """Convert a structured ValidationResult into the validation dict used by the retry flow"""
+        return {
+            "is_valid": result.is_valid,
+            "summary": result.error_summary if result.error_summary else "No errors found" if result.is_valid else "Validation failed",
+            "errors": [f"{error.spec_name}: {error.check}: NO - {error.explanation}" for error in result.errors],
+            "correction_needed": result.correction_needed,
+            "raw_response": result.model_dump_json()
+        }
+    
+    def _build_validation_prompt(self, final_result: str, csv_result: str, pns_specs: List[Dict[str, Any]], product_name: str,
+                                 source_sections: Optional[Tuple[str, str]] = None) -> str:
+        """Build validation prompt for checking final triangulation result"""
+        # Reuse the rendered source sections when the caller already built them for another prompt
+        csv_data, pns_data = source_sections or self._format_source_sections(csv_result, pns_specs)
+        
+        prompt = VALIDATION_PROMPT_PREFIX + f"""<original_sources>
 {csv_data}
 {pns_data}
 </original_sources>
 
 <final_result_to_validate>
 {final_result}
-</final_result_to_validate>
-
-<validation_instructions>
-For each specification in the final result, check:
-
-1. Does this specification exist semantically in CSV data? (YES/NO + explanation)
-2. Does this specification exist semantically in PNS data? (YES/NO + explanation)  
-3. Are the options in final result common to BOTH matched specs? (YES/NO + explanation)
-4. Is the specification name from PNS? (YES/NO + explanation)
-
-After checking all specs individually, provide:
-- OVERALL_VALID: YES/NO
-- ERROR_SUMMARY: Brief summary of any errors found
-- CORRECTION_NEEDED: What specific changes are needed
-</validation_instructions>
-
-<output_format>
-SPEC_1_VALIDATION:
-- Spec Name: [name from final result]
-- Exists in CSV: YES/NO - [explanation]
-- Exists in PNS: YES/NO - [explanation]  
-- Options are common: YES/NO - [explanation]
-- Uses PNS naming: YES/NO - [explanation]
-
-SPEC_2_VALIDATION:
-[repeat for each spec]
-
-OVERALL_VALIDATION:
-- OVERALL_VALID: YES/NO
-- ERROR_SUMMARY: [brief summary]
-- CORRECTION_NEEDED: [specific corrections needed]
-</output_format>"""
+</final_result_to_validate>"""
         
         return prompt
     
     def _parse_csv_to_structured_format(self, csv_result: str) -> List[Dict[str, str]]:
         """Parse CSV triangulation result into standardized format"""
-        if not csv_result:
-            return []
-        
-        structured_specs = []
-        
-        try:
-            lines = csv_result.strip().split('\n')
-            
-            # Find table data (skip headers and separators)
-            for line in lines:
-                line = line.strip()
-                
-                # Skip empty lines, headers, and separator lines
-                if not line or 'Specification Name' in line or line.startswith('|--') or line.startswith('|-'):
-                    continue
-                
-                # Look for table rows (containing | separator)
-                if '|' in line:
-                    # Clean up the line
-                    cleaned_line = line
-                    if cleaned_line.startswith('|'):
-                        cleaned_line = cleaned_line[1:]
-                    if cleaned_line.endswith('|'):
-                        cleaned_line = cleaned_line[:-1]
-                    
-                    parts = [part.strip() for part in cleaned_line.split('|')]
-                    
-                    # Ensure we have at least spec name and options
-                    if len(parts) >= 2 and parts[0] and parts[1]:
-                        structured_specs.append({
-                            'name': parts[0],
-                            'options': parts[1],
-                            'source': 'CSV'
-                        })
-            
-            logger.debug(f"Parsed {len(structured_specs)} CSV specs into structured format")
-            return structured_specs
-            
-        except Exception as e:
-            logger.warning(f"Error parsing CSV to structured format: {e}")
-            return []
+        return parse_csv_to_structured_format(csv_result)
     
     def _parse_pns_to_structured_format(self, pns_specs: List[Dict[str, Any]]) -> List[Dict[str, str]]:
         """Parse PNS specs into standardized format with frequency information"""
-        if not pns_specs:
-            return []
-        
-        structured_specs = []
-        
-        try:
-            for spec in pns_specs:
-                if isinstance(spec, dict):
-                    spec_name = spec.get('spec_name', 'Unknown')
-                    spec_options = spec.get('option', 'Unknown')
-                    spec_frequency = spec.get('frequency', 'N/A')
-                    spec_status = spec.get('spec_status', 'N/A')
-                    spec_priority = spec.get('importance_level', 'N/A')
-                    
-                    # Keep options clean but preserve structure
-                    if spec_options and ' / ' in spec_options:
-                        # Split by / and clean each option while preserving frequency context
-                        options_list = [opt.strip() for opt in spec_options.split(' / ')]
-                        cleaned_options = ', '.join(options_list)
-                    else:
-                        cleaned_options = spec_options
-                    
-                    structured_specs.append({
-                        'name': spec_name,
-                        'options': cleaned_options,
-                        'frequency': spec_frequency,
-                        'status': spec_status,
-                        'priority': spec_priority,
-                        'source': 'PNS'
-                    })
-            
-            logger.debug(f"Parsed {len(structured_specs)} PNS specs into structured format with frequency data")
-            return structured_specs
-            
-        except Exception as e:
-            logger.warning(f"Error parsing PNS to structured format: {e}")
-            return []
+        return parse_pns_to_structured_format(pns_specs)
     
     def _parse_validation_response(self, validation_response: str) -> Dict[str, Any]:
         """Parse LLM validation response into structured format"""
         try:
-            # Look for OVERALL_VALID result
-            is_valid = "OVERALL_VALID: YES" in validation_response
-            
-            # Extract error summary
-            error_summary = ""
-            summary_start = validation_response.find("ERROR_SUMMARY:")
-            if summary_start != -1:
-                summary_section = validation_response[summary_start:].split('\n')[0]
-                error_summary = summary_section.replace("ERROR_SUMMARY:", "").strip()
-            
-            # Extract correction needed
-            correction_needed = ""
-            correction_start = validation_response.find("CORRECTION_NEEDED:")
-            if correction_start != -1:
-                correction_section = validation_response[correction_start:].split('\n')[0]
-                correction_needed = correction_section.replace("CORRECTION_NEEDED:", "").strip()
-            
-            # Extract individual validation errors for detailed feedback
-            validation_errors = []
-            lines = validation_response.split('\n')
-            current_spec = ""
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith("- Spec Name:"):
-                    current_spec = line.replace("- Spec Name:", "").strip()
-                elif ": NO -" in line and current_spec:
-                    validation_errors.append(f"{current_spec}: {line}")
-            
-            return {
-                "is_valid": is_valid,
-                "summary": error_summary if error_summary else "No errors found" if is_valid else "Validation failed",
-                "errors": validation_errors,
-                "correction_needed": correction_needed,
-                "raw_response": validation_response
-            }
+            return parse_validation_response(validation_response)
             
         except Exception as e:
             logger.error(f"Error parsing validation response: {e}")
@@ -992,72 +1248,16 @@ OVERALL_VALIDATION:
             }
     
     def _build_retry_prompt(self, product_name: str, csv_result: str, pns_specs: List[Dict[str, Any]], 
-                           first_attempt: str, validation_errors: List[str]) -> str:
+                           first_attempt: str, validation_errors: List[str],
+                           source_sections: Optional[Tuple[str, str]] = None) -> str:
         """Build retry prompt with validation feedback"""
-        
-        # Convert both sources to standardized format for consistent LLM processing
-        csv_structured = self._parse_csv_to_structured_format(csv_result)
-        pns_structured = self._parse_pns_to_structured_format(pns_specs)
-        
-        # Prepare standardized CSV data
-        csv_data = "\n=== CSV TRIANGULATED SPECIFICATIONS ===\n"
-        if csv_structured:
-            for i, spec in enumerate(csv_structured, 1):
-                csv_data += f"{i}. Spec: {spec['name']} | Options: {spec['options']} | Source: CSV\n"
-        else:
-            csv_data += "No CSV specifications available\n"
-        
-        # Prepare standardized PNS data
-        pns_data = "\n=== PNS EXTRACTED SPECIFICATIONS ===\n"
-        if pns_structured:
-            for i, spec in enumerate(pns_structured, 1):
-                pns_data += f"{i}. Spec: {spec['name']} | Options: {spec['options']} | Freq: {spec['frequency']} | Status: {spec['status']} | Priority: {spec['priority']} | Source: PNS\n"
-        else:
-            pns_data += "No PNS specifications available\n"
+        # Reuse the rendered source sections when the caller already built them for another prompt
+        csv_data, pns_data = source_sections or self._format_source_sections(csv_result, pns_specs)
         
         # Prepare validation feedback
-        validation_feedback = "\n=== VALIDATION ERRORS FROM FIRST ATTEMPT ===\n"
-        for error in validation_errors:
-            validation_feedback += f"❌ {error}\n"
+        validation_feedback = "\n=== VALIDATION ERRORS FROM FIRST ATTEMPT ===\n" + "".join(f"❌ {error}\n" for error in validation_errors)
         
-        prompt = f"""<role>
-You are a final consensus specialist fixing errors in triangulation. Your previous attempt had validation errors that need to be corrected.
-</role>
-
-<task>
-Create a CORRECTED final consensus specification table showing ONLY specifications that appear in BOTH CSV and PNS data sources with ONLY common options.
-</task>
-
-<critical_corrections_needed>
-Your first attempt had these specific errors:
-{validation_feedback}
-
-You MUST fix these errors in your corrected response.
-</critical_corrections_needed>
-
-<strict_consensus_rules>
-APPLY THESE RULES EXACTLY:
-
-STEP 1 - IDENTIFY SEMANTIC MATCHES ONLY:
-• Find specifications that exist in BOTH CSV and PNS (names can differ but meaning must be similar)
-• Use options overlap to confirm specs are the same (e.g., both have "KVA" values = power specs)
-
-STEP 2 - EXTRACT COMMON OPTIONS ONLY:
-• For each matched specification, find options that exist in BOTH the CSV spec AND the PNS spec
-• EXCLUDE options that exist in only one source
-
-STEP 3 - USE PNS NAMING AND PRIORITIZATION:
-• ALWAYS use the PNS specification name (since PNS is pre-validated)
-• Format options using PNS style when possible
-• Consider PNS frequency and priority data when selecting common options
-
-STEP 4 - STRICT VALIDATION:
-• If a specification doesn't have common options → EXCLUDE IT
-• If a specification exists in only one source → EXCLUDE IT
-• If no consensus specifications exist → State "No consensus specifications found"
-</strict_consensus_rules>
-
-<data_sources>
+        prompt = RETRY_PROMPT_PREFIX + f"""<data_sources>
 {csv_data}
 {pns_data}
 </data_sources>
@@ -1066,72 +1266,23 @@ STEP 4 - STRICT VALIDATION:
 {first_attempt}
 </first_attempt_with_errors>
 
-<output_requirements>
-Create the corrected consensus specification table with EXACTLY this format:
-
-| Specification Name | Top Options | Why it matters in the market | Impacts Pricing? |
-
-CRITICAL REQUIREMENTS:
-• ONLY show specifications that exist semantically in BOTH sources
-• ONLY show options that exist in BOTH the matched CSV and PNS specifications
-• Use PNS specification names for matched specs
-• If no consensus specs exist after strict filtering, state "No consensus specifications identified"
-• Address ALL validation errors from your first attempt
-</output_requirements>
+<critical_corrections_needed>
+Your first attempt had these specific errors:
+{validation_feedback}
 
-<final_validation_check>
-Before submitting, verify:
-□ Each specification exists semantically in both CSV and PNS data
-□ Each option exists in both the matched CSV spec AND matched PNS spec
-□ Specification names use PNS terminology
-□ No specifications from only one source are included
-□ All validation errors from first attempt are fixed
-</final_validation_check>"""
+You MUST fix these errors in your corrected response.
+</critical_corrections_needed>"""
         
         return prompt
     
     def _parse_final_triangulation_result(self, result: str) -> List[Dict[str, Any]]:
+        """Parse final triangulation result into structured table format, cached by output hash"""
+        return _cached_parse("final triangulation", result, self._parse_final_triangulation_table)
+    
+    def _parse_final_triangulation_table(self, result: str) -> List[Dict[str, Any]]:
         """Parse final triangulation result into structured table format"""
         try:
-            lines = result.strip().split('\n')
-            table_data = []
-            rank = 1
-            
-            logger.info(f"Processing {len(lines)} lines for final triangulation parsing")
-            
-            for i, line in enumerate(lines):
-                line = line.strip()
-                
-                # Skip empty lines, headers, and separator lines
-                if not line:
-                    continue
-                if 'Specification Name' in line:
-                    continue
-                if line.startswith('|--') or line.startswith('|-'):
-                    continue
-                if line.count('|') < 3:
-                    continue
-                
-                # Look for table rows
-                if '|' in line:
-                    cleaned_line = line
-                    if cleaned_line.startswith('|'):
-                        cleaned_line = cleaned_line[1:]
-                    if cleaned_line.endswith('|'):
-                        cleaned_line = cleaned_line[:-1]
-                    
-                    parts = [part.strip() for part in cleaned_line.split('|')]
-                    
-                    if len(parts) >= 4:
-                        table_data.append({
-                            'Rank': rank,
-                            'Specification': parts[0],
-                            'Top Options': parts[1],
-                            'Why it matters': parts[2].replace('in the market', '').strip(),
-                            'Impacts Pricing?': parts[3]
-                        })
-                        rank += 1
-                        logger.info(f"Added final triangulation row {rank-1}: {parts[0]}")
+            table_data = parse_final_table_rows(result)
             
             logger.info(f"Successfully parsed {len(table_data)} final triangulation table rows")
             return table_data
@@ -1148,9 +1299,13 @@ Before submitting, verify:
 
 def final_triangulate_results(state: SpecExtractionState) -> SpecExtractionState:
     """LangGraph node function for final triangulation"""
-    agent = FinalTriangulationAgent()
+    agent = _node_agent(FinalTriangulationAgent)
     return agent.final_triangulate(state)
 
+async def afinal_triangulate_results(state: SpecExtractionState) -> SpecExtractionState:
+    """Async LangGraph node function for final triangulation that keeps the event loop free during the LLM calls"""
+    return await asyncio.to_thread(final_triangulate_results, state)
+
 def check_all_agents_completed(state: SpecExtractionState) -> str:
     """Check if all agents have completed processing"""
     # Get all available sources (CSV files + PNS JSON if available)
@@ -1160,24 +1315,11 @@ def check_all_agents_completed(state: SpecExtractionState) -> str:
         
     agents_status = get_agents_status(state)
     
-    completed_sources = {
-        source for source, status in agents_status.items()
-        if status == "completed"
-    }
-    failed_sources = {
-        source for source, status in agents_status.items()
-        if status == "failed"
-    }
-    excluded_sources = {
-        source for source, status in agents_status.items()
-        if status == "excluded"
-    }
+    # We can proceed once every available source is completed, failed, or excluded; stop at the first one still running
+    for source in available_sources:
+        if agents_status.get(source) not in FINISHED_AGENT_STATUSES:
+            return "wait"  # Still processing
     
-    # If all available sources are either completed, failed, or excluded, we can proceed
-    if available_sources <= (completed_sources | failed_sources | excluded_sources):
-        if completed_sources:  # At least one completed successfully
-            return "triangulate"
-        else:  # All failed or excluded
-            return "all_failed"
-    else:
-        return "wait"  # Still processing 
\ No newline at end of file
+    if "completed" in agents_status.values():  # At least one completed successfully
+        return "triangulate"
+    return "all_failed"  # All failed or excluded 
\ No newline at end of file
@@ -3,6 +3,7 @@ import copy
 from typing import Dict, Any
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.runnables import RunnableLambda
 
 from ..utils.state import SpecExtractionState, get_agents_status, get_agent_results, get_errors
 from .extraction_agent import (
@@ -13,7 +14,7 @@ from .extraction_agent import (
     process_lms_chats,
     process_pns_data  # NEW: PNS as regular agent
 )
-from .triangulation_agent import triangulate_all_results, check_all_agents_completed
+from .triangulation_agent import triangulate_all_results, atriangulate_all_results, check_all_agents_completed
 # , meta_ensemble_triangulate  # Commented out - no longer used
 
 logger = logging.getLogger(__name__)
@@ -128,7 +129,8 @@ class SpecExtractionWorkflow:
         
         # Add coordination nodes
         workflow.add_node("wait_for_completion", self._wait_for_completion)
-        workflow.add_node("triangulate_results", triangulate_all_results)
+        # graph.invoke/stream run the sync function; ainvoke/astream await the async one off the event loop
+        workflow.add_node("triangulate_results", RunnableLambda(triangulate_all_results, afunc=atriangulate_all_results))
         workflow.add_node("handle_all_failed", self._handle_all_failed)
         
         # Set entry point - 5 agents start simultaneously (PNS now included)
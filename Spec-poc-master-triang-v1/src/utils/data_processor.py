@@ -1,39 +1,172 @@
+import os
+import numpy as np
 import pandas as pd
 import json
 import re
-from typing import Dict, List, Any, Optional
+from io import BytesIO
+from typing import Dict, List, Any, Optional, Union, Iterator, Callable, ClassVar, Sequence
 import logging
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from .state import COLUMN_MAPPINGS
 
 logger = logging.getLogger(__name__)
 
+# Optional: pyarrow's multithreaded CSV reader
+try:
+    import pyarrow
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Optional: orjson parses LMS chat JSON several times faster than the stdlib json module
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Token estimation constants
 AVERAGE_TOKENS_PER_CHAR = 0.25  # Conservative estimate for token counting
 MAX_TOKENS_FOR_CONTEXT = 100000  # Leave buffer for prompt and response
+CHUNK_ROW_OVERHEAD_CHARS = 8  # Frequency value, separator and newline added per formatted row
+
+# Opt-in: format large-dataset chunks on a thread pool (PARALLEL_CHUNK_FORMATTING=true), a bounded window ahead of the consumer
+PARALLEL_CHUNK_FORMATTING = os.getenv("PARALLEL_CHUNK_FORMATTING", "false").lower() == "true"
+MAX_CHUNK_WORKERS = 8
+
+# Parse large LMS chunks on worker processes (LMS_PARSE_PROCESSES=0 or 1 keeps parsing in-process)
+LMS_PARSE_PROCESSES = int(os.getenv("LMS_PARSE_PROCESSES", "0"))
+LMS_PARALLEL_MIN_ROWS = 2000  # Below this, process pool startup costs more than it saves
+
+# Chunk cache keyed by (content hash, source name, max rows), least recently used evicted first
+CHUNK_CACHE_MAX_ENTRIES = 64
+_CHUNK_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_CHUNK_CACHE_LOCK = threading.Lock()
+
+def _truncate_at_break(text: str, limit: int, separator: str, min_break: int, keep_break: bool) -> str:
+    """Cut text longer than limit at the last separator past min_break (else at limit) and append an ellipsis"""
+    if len(text) <= limit:
+        return text
+    # Search the original string in place instead of slicing it first and searching the copy
+    last_break = text.rfind(separator, 0, limit)
+    if last_break > min_break:
+        return text[:last_break + 1 if keep_break else last_break] + "..."
+    return text[:limit] + "..."
+
+def _extract_chat_lines(json_strs: Sequence[str]) -> List[str]:
+    """Parse LMS chat JSON entries into "key:value|Msg:..." lines, skipping entries with nothing useful"""
+    chat_lines = []
+    
+    for json_str in json_strs:
+        try:
+            chat_data = _json_loads(json_str)
+            
+            # Advanced information extraction
+            extracted_info = []
+            
+            # Prioritize specification-related content
+            if "isq" in chat_data and isinstance(chat_data["isq"], dict):
+                for key, value in chat_data["isq"].items():
+                    # Intelligent truncation preserving key information; try to preserve complete words.
+                    # Most values are already str, so skip the str() call for them
+                    value_str = value if type(value) is str else str(value)
+                    value_str = _truncate_at_break(value_str, 100, ' ', 80, keep_break=False)
+                    extracted_info.append(f"{key}:{value_str}")
+            
+            # Extract meaningful message content
+            message = chat_data.get("message_text")
+            if message:
+                # Intelligent truncation at a sentence end
+                message = message if type(message) is str else str(message)
+                message = _truncate_at_break(message, 150, '.', 120, keep_break=True)
+                extracted_info.append(f"Msg:{message}")
+            
+            # Only include if we have meaningful data
+            if extracted_info:
+                chat_lines.append("|".join(extracted_info) + "\n")
+                
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse JSON entry {len(chat_lines) + 1}: {str(e)[:100]} | Data preview: {json_str[:50]}...")
+            continue
+        except Exception as e:
+            logger.warning(f"Unexpected error processing LMS chat entry {len(chat_lines) + 1}: {str(e)[:100]}")
+            continue
+    
+    return chat_lines
 
 class DataProcessor:
     """Handles advanced data processing for different CSV sources with industry-leading preprocessing"""
     
     @staticmethod
-    def process_csv_data(file_content: str, source_name: str, max_rows: int = 8500) -> list:
-        """Process CSV data with top-class preprocessing pipeline and return list of chunks for batching"""
+    def process_csv_data(file_content: Union[str, bytes, os.PathLike], source_name: str, max_rows: int = 8500) -> Iterator[str]:
+        """Process CSV data (decoded text, raw bytes or a file path) and yield chunks for batching one at a time"""
+        # File paths can change on disk, so only in-memory content is cached
+        if not isinstance(file_content, (str, bytes)):
+            yield from DataProcessor._generate_chunks(file_content, source_name, max_rows)
+            return
+        
+        raw = file_content.encode() if isinstance(file_content, str) else file_content
+        cache_key = (hashlib.blake2b(raw, digest_size=16).hexdigest(), source_name, max_rows)
+        with _CHUNK_CACHE_LOCK:
+            cached_chunks = _CHUNK_CACHE.get(cache_key)
+            if cached_chunks is not None:
+                _CHUNK_CACHE.move_to_end(cache_key)
+        
+        if cached_chunks is not None:
+            logger.info(f"Reusing {len(cached_chunks)} cached chunks for {source_name}")
+            yield from cached_chunks
+            return
+        
+        chunks = []
+        for chunk_text in DataProcessor._generate_chunks(file_content, source_name, max_rows):
+            chunks.append(chunk_text)
+            yield chunk_text
+        
+        # Only fully consumed runs are cached, so a partial read never serves truncated chunks
+        with _CHUNK_CACHE_LOCK:
+            _CHUNK_CACHE[cache_key] = tuple(chunks)
+            _CHUNK_CACHE.move_to_end(cache_key)
+            while len(_CHUNK_CACHE) > CHUNK_CACHE_MAX_ENTRIES:
+                _CHUNK_CACHE.popitem(last=False)
+    
+    @staticmethod
+    def _generate_chunks(file_content: Union[str, bytes, os.PathLike], source_name: str, max_rows: int) -> Iterator[str]:
+        """Parse the CSV and yield formatted chunks for one source"""
         try:
-            # Read CSV from string content
-            from io import StringIO
-            df = pd.read_csv(StringIO(file_content))
+            # Read CSV from text, bytes or path
+            df = DataProcessor._read_csv(file_content)
             
             logger.info(f"Processing {source_name}: {len(df)} rows loaded")
             
             # Check minimum row requirement (10 rows minimum for processing)
             if len(df) < 10:
                 logger.warning(f"Dataset {source_name} excluded: Only {len(df)} rows available, minimum 10 rows required for processing")
-                return []  # Return empty list to skip processing
+                return  # Yield no chunks to skip processing
             
             # Get column mapping for this source
             column_config = COLUMN_MAPPINGS.get(source_name)
             if not column_config:
                 raise ValueError(f"No column mapping found for source: {source_name}")
             
+            # Resolve and validate the configured columns once, before any chunk is formatted
+            data_col = column_config["data_column"]
+            freq_col = column_config.get("frequency_column")
+            if data_col not in df.columns:
+                raise ValueError(f"Required column missing: {data_col}")
+            
+            # Keep text columns Arrow-backed so .str calls run on Arrow compute kernels
+            # and each df.iloc chunk below is a zero-copy slice of the same buffers
+            if PYARROW_AVAILABLE:
+                for text_col in df.select_dtypes(include=["object", "string"]).columns:
+                    df[text_col] = df[text_col].astype("string[pyarrow]")
+            
+            # Enforce the data column's dtype once, so no filter or formatter downstream re-casts it
+            df[data_col] = df[data_col].astype("string[pyarrow]" if PYARROW_AVAILABLE else "string").fillna("")
+            
             # COMMENTED OUT - Advanced preprocessing pipeline (users upload clean data)
             # df = DataProcessor._execute_advanced_preprocessing_pipeline(df, source_name, column_config)
             # logger.info(f"After advanced preprocessing: {len(df)} rows remaining")
@@ -51,43 +184,49 @@ class DataProcessor:
             adaptive_max_rows = chunk_sizes.get(source_name, max_rows)
             logger.info(f"Using adaptive chunk size of {adaptive_max_rows} rows for {source_name}")
             
-            # Create chunks for large datasets
-            chunks = []
+            # For search keywords: Sort by frequency once, so every chunk is an already-sorted slice
+            if source_name == "search_keywords" and freq_col in df.columns:
+                df = df.sort_values(freq_col, ascending=False, kind="stable")
+            
+            # Create chunks for large datasets, formatting each one only when the caller asks for it
             if len(df) > adaptive_max_rows:
                 logger.info(f"Large dataset detected ({len(df)} rows). Creating optimized chunks of {adaptive_max_rows} rows each.")
                 
-                # For search keywords: Sort by frequency first, then chunk
-                if source_name == "search_keywords" and "frequency_column" in column_config:
-                    freq_col = column_config["frequency_column"]
-                    if freq_col in df.columns:
-                        df = df.sort_values(freq_col, ascending=False)
-                
                 # Split into chunks with semantic boundary preservation
-                for i in range(0, len(df), adaptive_max_rows):
-                    chunk_df = df.iloc[i:i + adaptive_max_rows]
-                    chunk_text = DataProcessor._process_chunk_advanced(chunk_df, source_name, column_config, i // adaptive_max_rows + 1)
-                    
-                    # Estimate tokens and warn if still too high
-                    estimated_tokens = DataProcessor._estimate_tokens(chunk_text)
+                chunk_starts = range(0, len(df), adaptive_max_rows)
+                for i in chunk_starts:
+                    # Estimate tokens from the column lengths and warn before paying to format the chunk
+                    estimated_tokens = DataProcessor._estimate_chunk_tokens(df.iloc[i:i + adaptive_max_rows], column_config)
                     if estimated_tokens > 120000:  # 120k token warning threshold
                         logger.warning(f"Chunk {i // adaptive_max_rows + 1} for {source_name} estimated at {estimated_tokens} tokens - may exceed context limit")
+                
+                def format_chunk(start: int) -> str:
+                    return DataProcessor._process_chunk_advanced(df.iloc[start:start + adaptive_max_rows], source_name, column_config, start // adaptive_max_rows + 1)
+                
+                if PARALLEL_CHUNK_FORMATTING:
+                    # Chunks are independent read-only slices; keep at most one future per worker in flight so the generator stays lazy
+                    workers = min(MAX_CHUNK_WORKERS, os.cpu_count() or 1)
+                    with ThreadPoolExecutor(max_workers=workers) as executor:
+                        pending = deque()
+                        for i in chunk_starts:
+                            pending.append(executor.submit(format_chunk, i))
+                            if len(pending) >= workers:
+                                yield pending.popleft().result()
+                        while pending:
+                            yield pending.popleft().result()
+                else:
+                    for i in chunk_starts:
+                        yield format_chunk(i)
                     
-                    chunks.append(chunk_text)
-                    
-                logger.info(f"Created {len(chunks)} chunks for {source_name}")
+                logger.info(f"Created {(len(df) + adaptive_max_rows - 1) // adaptive_max_rows} chunks for {source_name}")
             else:
-                # Small dataset - single chunk
-                chunk_text = DataProcessor._process_chunk_advanced(df, source_name, column_config, 1)
-                
-                # Check token count even for small datasets
-                estimated_tokens = DataProcessor._estimate_tokens(chunk_text)
+                # Small dataset - single chunk; check token count even for small datasets
+                estimated_tokens = DataProcessor._estimate_chunk_tokens(df, column_config)
                 if estimated_tokens > 120000:
                     logger.warning(f"Single chunk for {source_name} estimated at {estimated_tokens} tokens - may need further splitting")
                 
-                chunks.append(chunk_text)
                 logger.info(f"Small dataset - single chunk for {source_name}")
-            
-            return chunks
+                yield DataProcessor._process_chunk_advanced(df, source_name, column_config, 1)
                 
         except Exception as e:
             logger.error(f"Error processing {source_name}: {str(e)}")
@@ -526,8 +665,8 @@ class DataProcessor:
         
     #     # Basic cleaning only
     #     df = df.dropna(subset=[data_col])
-    #     df = df[df[data_col].astype(str).str.strip() != ""]
-    #     df = df[df[data_col].astype(str).str.lower() != "nan"]
+    #     df = df[df[data_col].str.strip() != ""]
+    #     df = df[df[data_col].str.lower() != "nan"]
         
     #     logger.info(f"Fallback processing applied for {source_name}: {len(df)} rows")
     #     return df
@@ -538,18 +677,10 @@ class DataProcessor:
         logger.info(f"Processing advanced chunk {chunk_num} for {source_name}: {len(df)} rows")
         
         # Process based on source type with enhanced formatting
-        if source_name == "search_keywords":
-            return DataProcessor._process_search_keywords_advanced(df, config)
-        elif source_name == "whatsapp_specs":
-            return DataProcessor._process_whatsapp_specs_advanced(df, config)
-        elif source_name == "pns_calls":
-            return DataProcessor._process_pns_calls_advanced(df, config)
-        elif source_name == "rejection_comments":
-            return DataProcessor._process_rejection_comments_advanced(df, config)
-        elif source_name == "lms_chats":
-            return DataProcessor._process_lms_chats_advanced(df, config)
-        else:
+        processor = DataProcessor._PROCESSORS.get(source_name)
+        if processor is None:
             raise ValueError(f"Unknown source type: {source_name}")
+        return processor(df, config)
     
     @staticmethod
     def _process_search_keywords_advanced(df: pd.DataFrame, config: Dict) -> str:
@@ -563,38 +694,51 @@ class DataProcessor:
         
         # Advanced processing with quality metadata
         df_clean = df[[data_col, freq_col]].dropna()
-        df_clean = df_clean[df_clean[data_col].str.strip() != ""]
-        df_clean = df_clean.sort_values(freq_col, ascending=False)
+        # Blank test without materializing a stripped copy of every string
+        df_clean = df_clean[(df_clean[data_col] != "") & ~df_clean[data_col].str.isspace()]
+        # Rows arrive sorted by frequency from process_csv_data, so no re-sort per chunk
         
         # Enhanced CSV format with quality indicators
-        formatted_text = f"# SEARCH KEYWORDS DATA (Processed: {len(df_clean)} high-quality entries)\n"
-        formatted_text += f"{data_col},{freq_col}\n"
+        parts = [f"# SEARCH KEYWORDS DATA (Processed: {len(df_clean)} high-quality entries)\n", f"{data_col},{freq_col}\n"]
         
-        for _, row in df_clean.iterrows():
-            formatted_text += f"{row[data_col]},{row[freq_col]}\n"
+        # Build all rows in one vectorized pass instead of iterating row by row
+        parts.extend(df_clean[data_col] + "," + df_clean[freq_col].astype(str) + "\n")
+        # One join sizes the output exactly, with no intermediate header/body concatenation
+        formatted_text = "".join(parts)
         
         logger.info(f"Advanced search keywords processed: {len(df_clean)} entries with quality enhancement")
         return formatted_text
     
     @staticmethod
-    def _process_whatsapp_specs_advanced(df: pd.DataFrame, config: Dict) -> str:
-        """Process WhatsApp specs with advanced formatting"""
+    def _clean_data_column(df: pd.DataFrame, config: Dict, strip: bool) -> pd.Series:
+        """Return the source's data column without null or blank values, optionally stripped"""
         data_col = config["data_column"]
         
         if data_col not in df.columns:
             raise ValueError(f"Required column missing: {data_col}")
         
-        # Advanced processing
-        df_clean = df[data_col].dropna()
-        df_clean = df_clean[df_clean.str.strip() != ""]
+        values = df[data_col].dropna()
+        if strip:
+            values = values.str.strip()
+            return values[values != ""]
+        # Blank test without materializing a stripped copy of every string
+        return values[(values != "") & ~values.str.isspace()]
+    
+    @staticmethod
+    def _process_whatsapp_specs_advanced(df: pd.DataFrame, config: Dict) -> str:
+        """Process WhatsApp specs with advanced formatting"""
+        data_col = config["data_column"]
+        
+        # Advanced processing: strip, drop blanks, then deduplicate before formatting
+        df_clean = DataProcessor._clean_data_column(df, config, strip=True)
+        unique_specs = dict.fromkeys(df_clean.tolist())  # Ordered dedup on CPython's str hash fast path
         
-        # Enhanced format with metadata
-        formatted_text = f"# WHATSAPP SPECIFICATIONS (Processed: {len(df_clean)} validated entries)\n"
-        formatted_text += f"{data_col}\n"
-        for spec in df_clean.unique():
-            formatted_text += f"{spec}\n"
+        # Enhanced format with metadata; the count matches the entries emitted
+        parts = [f"# WHATSAPP SPECIFICATIONS (Processed: {len(unique_specs)} validated entries)\n", f"{data_col}\n"]
+        parts.extend(f"{spec}\n" for spec in unique_specs)
+        formatted_text = "".join(parts)
         
-        logger.info(f"Advanced WhatsApp specs processed: {len(df_clean)} entries")
+        logger.info(f"Advanced WhatsApp specs processed: {len(df_clean)} entries ({len(unique_specs)} unique)")
         return formatted_text
     
     @staticmethod
@@ -602,16 +746,11 @@ class DataProcessor:
         """Process PNS calls with advanced content optimization"""
         data_col = config["data_column"]
         
-        if data_col not in df.columns:
-            raise ValueError(f"Required column missing: {data_col}")
-        
         # Advanced processing
-        df_clean = df[data_col].dropna()
-        df_clean = df_clean[df_clean.str.strip() != ""]
+        df_clean = DataProcessor._clean_data_column(df, config, strip=False)
         
         # Enhanced format with quality optimization
-        formatted_text = f"# PNS CALL TRANSCRIPTS (Processed: {len(df_clean)} quality transcripts)\n"
-        formatted_text += f"{data_col}\n"
+        parts = [f"# PNS CALL TRANSCRIPTS (Processed: {len(df_clean)} quality transcripts)\n", f"{data_col}\n"]
         
         for i, transcript in enumerate(df_clean, 1):
             # Intelligent truncation preserving key content
@@ -625,8 +764,9 @@ class DataProcessor:
             else:
                 transcript_excerpt = transcript
                 
-            formatted_text += f"Call {i}: {transcript_excerpt}\n\n"
+            parts.append(f"Call {i}: {transcript_excerpt}\n\n")
         
+        formatted_text = "".join(parts)
         logger.info(f"Advanced PNS calls processed: {len(df_clean)} transcriptions")
         return formatted_text
     
@@ -635,109 +775,92 @@ class DataProcessor:
         """Process rejection comments with advanced categorization"""
         data_col = config["data_column"]
         
-        if data_col not in df.columns:
-            raise ValueError(f"Required column missing: {data_col}")
-        
-        # Advanced processing
-        df_clean = df[data_col].dropna()
-        df_clean = df_clean[df_clean.str.strip() != ""]
+        # Advanced processing: strip, drop blanks, then deduplicate before formatting
+        df_clean = DataProcessor._clean_data_column(df, config, strip=True)
+        unique_comments = dict.fromkeys(df_clean.tolist())  # Ordered dedup on CPython's str hash fast path
         
-        # Enhanced format with categorization hints
-        formatted_text = f"# REJECTION COMMENTS (Processed: {len(df_clean)} validated comments)\n"
-        formatted_text += f"{data_col}\n"
-        for comment in df_clean.unique():
-            formatted_text += f"{comment}\n"
+        # Enhanced format with categorization hints; the count matches the comments emitted
+        parts = [f"# REJECTION COMMENTS (Processed: {len(unique_comments)} validated comments)\n", f"{data_col}\n"]
+        parts.extend(f"{comment}\n" for comment in unique_comments)
+        formatted_text = "".join(parts)
         
-        logger.info(f"Advanced rejection comments processed: {len(df_clean)} entries")
+        logger.info(f"Advanced rejection comments processed: {len(df_clean)} entries ({len(unique_comments)} unique)")
         return formatted_text
     
     @staticmethod
     def _process_lms_chats_advanced(df: pd.DataFrame, config: Dict) -> str:
         """Process LMS chats with advanced JSON parsing and optimization"""
-        data_col = config["data_column"]
-        
-        if data_col not in df.columns:
-            raise ValueError(f"Required column missing: {data_col}")
-        
         # Advanced processing
-        df_clean = df[data_col].dropna()
-        
-        formatted_text = f"# LMS CHAT DATA (Processed with advanced JSON parsing)\n"
-        formatted_text += f"extracted_chat_data\n"
-        processed_count = 0
+        json_strs = DataProcessor._clean_data_column(df, config, strip=True)
+        
+        parts = ["# LMS CHAT DATA (Processed with advanced JSON parsing)\n", "extracted_chat_data\n"]
+        
+        # Basic validation before parsing, for the whole column at once
+        well_formed = json_strs.str.startswith('{') & json_strs.str.endswith('}')
+        malformed_count = int((~well_formed).sum())
+        if malformed_count:
+            logger.debug(f"Skipping {malformed_count} malformed JSON entries (missing braces)")
+        
+        candidates = json_strs[well_formed].to_numpy()
+        if LMS_PARSE_PROCESSES > 1 and len(candidates) > LMS_PARALLEL_MIN_ROWS:
+            # Parsing is CPU-bound Python, so large chunks are split across worker processes
+            slices = np.array_split(candidates, LMS_PARSE_PROCESSES)
+            with ProcessPoolExecutor(max_workers=LMS_PARSE_PROCESSES) as executor:
+                for chat_lines in executor.map(_extract_chat_lines, slices):
+                    parts.extend(chat_lines)
+        else:
+            parts.extend(_extract_chat_lines(candidates))
+        processed_count = len(parts) - 2  # Minus the two header parts
         
-        for json_str in df_clean:
-            try:
-                if isinstance(json_str, str) and json_str.strip():
-                    # Basic validation before parsing
-                    json_str = json_str.strip()
-                    if not (json_str.startswith('{') and json_str.endswith('}')):
-                        logger.debug(f"Skipping malformed JSON (missing braces): {json_str[:30]}...")
-                        continue
-                    
-                    chat_data = json.loads(json_str)
-                    
-                    # Advanced information extraction
-                    extracted_info = []
-                    
-                    # Prioritize specification-related content
-                    if "isq" in chat_data and isinstance(chat_data["isq"], dict):
-                        for key, value in chat_data["isq"].items():
-                            # Intelligent truncation preserving key information
-                            value_str = str(value)
-                            if len(value_str) > 100:
-                                # Try to preserve complete words
-                                truncated = value_str[:100]
-                                last_space = truncated.rfind(' ')
-                                if last_space > 80:
-                                    truncated = truncated[:last_space]
-                                value_str = truncated + "..."
-                            extracted_info.append(f"{key}:{value_str}")
-                    
-                    # Extract meaningful message content
-                    if "message_text" in chat_data and chat_data["message_text"]:
-                        message = str(chat_data["message_text"])
-                        if len(message) > 150:
-                            # Intelligent truncation
-                            truncated = message[:150]
-                            last_sentence = truncated.rfind('.')
-                            if last_sentence > 120:
-                                truncated = truncated[:last_sentence + 1]
-                            message = truncated + "..."
-                        extracted_info.append(f"Msg:{message}")
-                    
-                    # Only include if we have meaningful data
-                    if extracted_info:
-                        chat_line = "|".join(extracted_info) + "\n"
-                        formatted_text += chat_line
-                        processed_count += 1
-                        
-            except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse JSON entry {processed_count + 1}: {str(e)[:100]} | Data preview: {json_str[:50]}...")
-                continue
-            except Exception as e:
-                logger.warning(f"Unexpected error processing LMS chat entry {processed_count + 1}: {str(e)[:100]}")
-                continue
-        
-        total_entries = len(df_clean)
+        total_entries = len(json_strs)
         success_rate = (processed_count / total_entries * 100) if total_entries > 0 else 0
         logger.info(f"Advanced LMS chats processed: {processed_count}/{total_entries} entries ({success_rate:.1f}% success rate)")
-        return formatted_text
+        return "".join(parts)
+    
+    # Source-specific chunk formatters, dispatched by source name like COLUMN_MAPPINGS
+    _PROCESSORS: ClassVar[Dict[str, Callable[[pd.DataFrame, Dict], str]]] = {
+        "search_keywords": _process_search_keywords_advanced.__func__,
+        "whatsapp_specs": _process_whatsapp_specs_advanced.__func__,
+        "pns_calls": _process_pns_calls_advanced.__func__,
+        "rejection_comments": _process_rejection_comments_advanced.__func__,
+        "lms_chats": _process_lms_chats_advanced.__func__,
+    }
 
     @staticmethod
-    def _estimate_tokens(text: str) -> int:
-        """Estimate token count for text with improved accuracy"""
-        # More accurate token estimation accounting for JSON and structured data
-        char_count = len(text)
-        word_count = len(text.split())
-        
-        # Tokens are roughly 0.75 * word count for English text
-        # But structured data (JSON, CSV) has more punctuation so use char-based estimate
-        word_based_estimate = int(word_count * 0.75)
-        char_based_estimate = int(char_count * AVERAGE_TOKENS_PER_CHAR)
-        
-        # Use the higher estimate for safety
-        return max(word_based_estimate, char_based_estimate)
+    def _read_csv(file_content: Union[str, bytes, os.PathLike]) -> pd.DataFrame:
+        """Read CSV content with the multithreaded pyarrow engine when available, else the default C engine"""
+        # Paths go straight to the parser's native file reader; text is encoded once to bytes
+        if isinstance(file_content, os.PathLike):
+            source = file_content
+        elif isinstance(file_content, bytes):
+            source = file_content
+        else:
+            source = file_content.encode("utf-8")
+        
+        if PYARROW_AVAILABLE:
+            try:
+                # Quoted chat and spec text spans lines; empty cells become NaN as with the C engine
+                return pa_csv.read_csv(
+                    source if isinstance(source, os.PathLike) else BytesIO(source),
+                    parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                    convert_options=pa_csv.ConvertOptions(strings_can_be_null=True)
+                ).to_pandas()
+            except pyarrow.ArrowException as e:
+                # Ragged rows (fewer cells than the header) need the C engine, which pads them with NaN
+                logger.info(f"PyArrow CSV parsing failed, falling back to default parser: {e}")
+        
+        return pd.read_csv(source if isinstance(source, os.PathLike) else BytesIO(source))
+    
+    @staticmethod
+    def _estimate_chunk_tokens(chunk_df: pd.DataFrame, config: Dict) -> int:
+        """Estimate the formatted chunk's token count from data column lengths, without building the text"""
+        data_col = config["data_column"]
+        if data_col not in chunk_df.columns:
+            return 0
+        
+        # The data column is a string dtype by now, so Arrow lengths come straight from the offsets buffer
+        total_chars = int(chunk_df[data_col].str.len().sum()) + len(chunk_df) * CHUNK_ROW_OVERHEAD_CHARS
+        return int(total_chars * AVERAGE_TOKENS_PER_CHAR)
     
     # @staticmethod
     # def _smart_sample(df: pd.DataFrame, source_name: str, config: Dict, max_rows: int) -> pd.DataFrame:
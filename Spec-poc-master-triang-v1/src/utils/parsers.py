@@ -0,0 +1,159 @@
+import re
+import logging
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+# Stage-1 triangulation rows: at least 4 cells after one optional leading/trailing pipe, skipping headers
+# and separators. A cell only exists if its pipe is followed by more text, so a trailing pipe opens no cell
+_TRIANGULATION_ROW_RE = re.compile(
+    r'^(?![^\S\n]*\|-)(?![^\n]*Specification Name)(?:[^\S\n]*\||(?![^\S\n]*\|))'
+    r'([^|\n]*)\|([^|\n]*)\|([^|\n]*)\|(?=[^\n]*?\S)([^|\n]*)'
+    r'(?:\|(?=[^\n]*?\S)([^|\n]*))?[^\n]*$',
+    re.M
+)
+
+# CSV triangulation rows for validation/retry prompts: the first two cells after one optional leading pipe
+_CSV_SPEC_ROW_RE = re.compile(
+    r'^(?![^\S\n]*\|-)(?![^\n]*Specification Name)(?:[^\S\n]*\||(?![^\S\n]*\|))'
+    r'([^|\n]*)\|([^|\n]*)[^\n]*$',
+    re.M
+)
+
+def parse_final_table_rows(text: str, start_rank: int = 1) -> List[Dict[str, Any]]:
+    """Convert the complete table lines in text into final triangulation rows, ranked from start_rank"""
+    rows: List[Dict[str, Any]] = []
+    for line in text.split('\n'):
+        line = line.strip()
+        
+        # Skip headers, separators and lines too short to be rows
+        if line.count('|') < 3 or 'Specification Name' in line or line.startswith('|-'):
+            continue
+        
+        # Split by hand so rows wider than the expected four cells (extra '|' in a cell) still parse
+        parts = [part.strip() for part in line.removeprefix('|').removesuffix('|').split('|')]
+        if len(parts) >= 4:
+            rows.append({
+                'Rank': start_rank + len(rows),
+                'Specification': parts[0],
+                'Top Options': parts[1],
+                'Why it matters': parts[2].replace('in the market', '').strip(),
+                'Impacts Pricing?': parts[3]
+            })
+    return rows
+
+def parse_triangulation_table_rows(text: str, start_rank: int = 1) -> List[Dict[str, Any]]:
+    """Convert the table lines in text into stage-1 triangulation rows, ranked in table order from start_rank"""
+    # Every row contains a pipe, so only the lines from the first pipe to the last one need scanning
+    first_pipe = text.find('|')
+    if first_pipe == -1:
+        return []
+    region_start = text.rfind('\n', 0, first_pipe) + 1
+    region_end = text.find('\n', text.rfind('|'))
+    
+    rows: List[Dict[str, Any]] = []
+    matches = _TRIANGULATION_ROW_RE.finditer(text, region_start, len(text) if region_end == -1 else region_end)
+    for rank, match in enumerate(matches, start_rank):
+        spec, options, why, pricing, sources = match.groups()
+        rows.append({
+            'Rank': rank,
+            'Specification': spec.strip(),
+            'Top Options': options.replace('(based on data)', '').strip(),
+            'Why it matters': why.replace('in the market', '').strip(),
+            'Impacts Pricing?': pricing.strip(),
+            'Sources': 'N/A' if sources is None else sources.strip()  # Old 4-column rows have no Sources
+        })
+    return rows
+
+def parse_csv_to_structured_format(csv_result: str) -> List[Dict[str, str]]:
+    """Parse CSV triangulation result into standardized format"""
+    if not isinstance(csv_result, str):
+        raise TypeError(f"csv_result must be a str, got {type(csv_result).__name__}")
+    if not csv_result:
+        return []
+    
+    # Rows need a non-empty spec name and options; header and separator lines never match
+    structured_specs: List[Dict[str, str]] = [
+        {'name': name, 'options': options, 'source': 'CSV'}
+        for name, options in (
+            (name.strip(), options.strip()) for name, options in _CSV_SPEC_ROW_RE.findall(csv_result)
+        )
+        if name and options
+    ]
+    
+    logger.debug(f"Parsed {len(structured_specs)} CSV specs into structured format")
+    return structured_specs
+
+def parse_pns_to_structured_format(pns_specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Parse PNS specs into standardized format with frequency information"""
+    if not pns_specs:
+        return []
+    
+    structured_specs: List[Dict[str, Any]] = []
+    
+    for spec in pns_specs:
+        if isinstance(spec, dict):
+            spec_name = spec.get('spec_name', 'Unknown')
+            spec_options = spec.get('option', 'Unknown')
+            spec_frequency = spec.get('frequency', 'N/A')
+            spec_status = spec.get('spec_status', 'N/A')
+            spec_priority = spec.get('importance_level', 'N/A')
+            
+            # Keep options clean but preserve structure
+            if spec_options and ' / ' in spec_options:
+                # Split by / and clean each option while preserving frequency context
+                options_list = [opt.strip() for opt in spec_options.split(' / ')]
+                cleaned_options = ', '.join(options_list)
+            else:
+                cleaned_options = spec_options
+            
+            structured_specs.append({
+                'name': spec_name,
+                'options': cleaned_options,
+                'frequency': spec_frequency,
+                'status': spec_status,
+                'priority': spec_priority,
+                'source': 'PNS'
+            })
+    
+    logger.debug(f"Parsed {len(structured_specs)} PNS specs into structured format with frequency data")
+    return structured_specs
+
+def parse_validation_response(validation_response: str) -> Dict[str, Any]:
+    """Parse LLM validation response into structured format"""
+    # Look for OVERALL_VALID result
+    is_valid = "OVERALL_VALID: YES" in validation_response
+    
+    # Extract error summary
+    error_summary = ""
+    summary_start = validation_response.find("ERROR_SUMMARY:")
+    if summary_start != -1:
+        summary_section = validation_response[summary_start:].split('\n')[0]
+        error_summary = summary_section.replace("ERROR_SUMMARY:", "").strip()
+    
+    # Extract correction needed
+    correction_needed = ""
+    correction_start = validation_response.find("CORRECTION_NEEDED:")
+    if correction_start != -1:
+        correction_section = validation_response[correction_start:].split('\n')[0]
+        correction_needed = correction_section.replace("CORRECTION_NEEDED:", "").strip()
+    
+    # Extract individual validation errors for detailed feedback
+    validation_errors: List[str] = []
+    lines = validation_response.split('\n')
+    current_spec = ""
+    
+    for line in lines:
+        line = line.strip()
+        if line.startswith("- Spec Name:"):
+            current_spec = line.replace("- Spec Name:", "").strip()
+        elif ": NO -" in line and current_spec:
+            validation_errors.append(f"{current_spec}: {line}")
+    
+    return {
+        "is_valid": is_valid,
+        "summary": error_summary if error_summary else "No errors found" if is_valid else "Validation failed",
+        "errors": validation_errors,
+        "correction_needed": correction_needed,
+        "raw_response": validation_response
+    }
@@ -0,0 +1,32 @@
+import logging
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from src.utils.data_processor import DataProcessor
+
+
+MULTILINE_CSV = b'''MCAT ID,MCAT Name,message_text_json,Frequency
+6472,Atta Chakki,"{""message_text"": ""Need 2 HP motor
+with stand, 50 kg/hr""}",2
+6472,Atta Chakki,,3
+6472,Atta Chakki,"Single line, quoted",1
+'''
+
+
+def test_read_csv_keeps_multiline_values_without_fallback(caplog):
+    with caplog.at_level(logging.INFO, logger="src.utils.data_processor"):
+        df = DataProcessor._read_csv(MULTILINE_CSV)
+    
+    pd.testing.assert_frame_equal(df, pd.read_csv(BytesIO(MULTILINE_CSV)))
+    assert df.loc[0, "message_text_json"].endswith('with stand, 50 kg/hr"}')
+    assert pd.isna(df.loc[1, "message_text_json"])
+    assert "falling back" not in caplog.text
+
+
+@pytest.mark.parametrize("content", [MULTILINE_CSV.decode("utf-8"), MULTILINE_CSV + b"6\n"])
+def test_read_csv_matches_default_parser(content):
+    expected = pd.read_csv(BytesIO(content.encode("utf-8") if isinstance(content, str) else content))
+    
+    pd.testing.assert_frame_equal(DataProcessor._read_csv(content), expected)
@@ -0,0 +1,114 @@
+import pytest
+
+from src.utils.parsers import parse_csv_to_structured_format, parse_final_table_rows, parse_triangulation_table_rows
+
+
+FINAL_TABLE = """Here is the consensus table:
+
+| Specification Name | Top Options | Why it matters | Impacts Pricing? |
+|---|---|---|---|
+| Motor Power | 1 HP, 2 HP | Sets grinding capacity in the market | ✅ Yes |
+| Material | Steel, Cast Iron | Affects durability | ❌ No |
+"""
+
+STAGE1_TABLE = """| Specification Name | Top Options | Why it matters | Impacts Pricing? | Sources |
+|---|---|---|---|---|
+| Power | 1 HP (based on data) | Sizing in the market | Yes | search_keywords, pns_data |
+| Voltage | 220 V | Wiring | No
+| Material | Steel | Durability | Yes |
+Notes: all rows are core specifications.
+"""
+
+
+def test_final_rows_skip_header_and_separator():
+    rows = parse_final_table_rows(FINAL_TABLE)
+    
+    assert [row['Specification'] for row in rows] == ['Motor Power', 'Material']
+    assert rows[0] == {
+        'Rank': 1,
+        'Specification': 'Motor Power',
+        'Top Options': '1 HP, 2 HP',
+        'Why it matters': 'Sets grinding capacity',
+        'Impacts Pricing?': '✅ Yes'
+    }
+
+
+def test_final_rows_tolerate_over_wide_rows():
+    # Extra '|' characters inside "Why it matters" push this row past 16 cells; it must still parse
+    wide_row = "| Voltage | 220 V, 440 V | Drives " + " | ".join(["wiring"] * 16) + " | ✅ Yes |"
+    text = wide_row + "\n| Material | Steel, Cast Iron | Affects durability | ❌ No |\n"
+    
+    rows = parse_final_table_rows(text)
+    
+    assert [row['Specification'] for row in rows] == ['Voltage', 'Material']
+    assert rows[0]['Top Options'] == '220 V, 440 V'
+    assert rows[1]['Impacts Pricing?'] == '❌ No'
+
+
+def test_final_rows_without_outer_pipes_and_start_rank():
+    rows = parse_final_table_rows("Power | 1 HP, 2 HP | Capacity | Yes\n", start_rank=4)
+    
+    assert rows == [{
+        'Rank': 4,
+        'Specification': 'Power',
+        'Top Options': '1 HP, 2 HP',
+        'Why it matters': 'Capacity',
+        'Impacts Pricing?': 'Yes'
+    }]
+
+
+def test_final_rows_ignore_prose():
+    assert parse_final_table_rows("No consensus specifications identified") == []
+
+
+def test_triangulation_rows_skip_header_separator_and_prose():
+    rows = parse_triangulation_table_rows(STAGE1_TABLE, start_rank=3)
+    
+    assert [(row['Rank'], row['Specification']) for row in rows] == [(3, 'Power'), (4, 'Voltage'), (5, 'Material')]
+    assert rows[0] == {
+        'Rank': 3,
+        'Specification': 'Power',
+        'Top Options': '1 HP',
+        'Why it matters': 'Sizing',
+        'Impacts Pricing?': 'Yes',
+        'Sources': 'search_keywords, pns_data'
+    }
+
+
+def test_triangulation_rows_without_trailing_pipe_or_sources_column():
+    rows = parse_triangulation_table_rows(STAGE1_TABLE)
+    
+    # "Voltage" has no trailing pipe and "Material" is an old 4-column row; neither carries Sources
+    assert rows[1]['Impacts Pricing?'] == 'No'
+    assert rows[1]['Sources'] == 'N/A'
+    assert rows[2]['Sources'] == 'N/A'
+
+
+def test_triangulation_rows_tolerate_over_wide_rows():
+    rows = parse_triangulation_table_rows("| Power | 1 HP | Sizing | Yes | pns_data | extra | cells |\n")
+    
+    assert rows[0]['Specification'] == 'Power'
+    assert rows[0]['Sources'] == 'pns_data'
+
+
+def test_triangulation_rows_ignore_text_without_table():
+    assert parse_triangulation_table_rows("No consensus specifications identified") == []
+
+
+def test_csv_specs_skip_header_separator_and_empty_cells():
+    text = STAGE1_TABLE + "| | Orphan option |\n| Empty options | |\nWeight | 5 kg\n"
+    
+    specs = parse_csv_to_structured_format(text)
+    
+    assert [(spec['name'], spec['options']) for spec in specs] == [
+        ('Power', '1 HP (based on data)'),
+        ('Voltage', '220 V'),
+        ('Material', 'Steel'),
+        ('Weight', '5 kg'),
+    ]
+    assert parse_csv_to_structured_format("") == []
+
+
+def test_csv_specs_reject_non_string_input():
+    with pytest.raises(TypeError):
+        parse_csv_to_structured_format(None)
@@ -0,0 +1,324 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents import triangulation_agent
+from src.agents.triangulation_agent import FinalTriangulationAgent, SpecValidation, TriangulationAgent, ValidationResult
+
+
+@pytest.fixture
+def final_agent():
+    # The helpers under test never touch the LLM, so skip the client setup in __init__
+    return FinalTriangulationAgent.__new__(FinalTriangulationAgent)
+
+
+def pns_spec(name, option, frequency, status, total):
+    return {
+        "spec_name": name,
+        "option": option,
+        "frequency": f"{frequency} (Total: {total})",
+        "spec_status": status,
+        "importance_level": "Primary",
+        "total_frequency": total
+    }
+
+
+def test_dedupe_pns_merges_same_canonical_name_in_place(final_agent):
+    specs = [
+        pns_spec("Material", "Steel", "5", "Core", 5),
+        pns_spec("Colour", "Red / Blue", "9 / 4", "Core / Listed", 13),
+        pns_spec("color", "blue / Green", "3 / 2", "Listed / Listed", 5),
+    ]
+    
+    merged = final_agent._dedupe_pns(specs)
+    
+    # Input order is kept and the later duplicate folds into the first occurrence
+    assert [spec["spec_name"] for spec in merged] == ["Material", "Colour"]
+    assert merged[1]["option"] == "Red / Blue / Green"
+    assert merged[1]["frequency"] == "9 / 4 / 2 (Total: 18)"
+    assert merged[1]["spec_status"] == "Core / Listed / Listed"
+    assert specs[1]["option"] == "Red / Blue"
+
+
+def test_dedupe_pns_keeps_distinct_units_apart(final_agent):
+    specs = [
+        pns_spec("Voltage (V)", "220 / 440", "8 / 3", "Core / Core", 11),
+        pns_spec("Voltage (kV)", "11 / 33", "2 / 1", "Core / Core", 3),
+        pns_spec("Power", "1 HP", "4", "Core", 4),
+        pns_spec("Motor Power", "2 HP", "3", "Core", 3),
+    ]
+    
+    assert final_agent._dedupe_pns(specs) == specs
+
+
+def test_dedupe_pns_keeps_options_when_lists_differ_in_length(final_agent):
+    specs = [
+        pns_spec("Size", "10 inch", "6", "Core", 6),
+        pns_spec("Size", "12 inch / 14 inch / 16 inch", "4", "Core", 4),
+    ]
+    
+    merged = final_agent._dedupe_pns(specs)
+    
+    assert merged[0]["option"] == "10 inch / 12 inch / 14 inch / 16 inch"
+    assert merged[0]["frequency"] == "6 / 4 / N/A / N/A (Total: 10)"
+    assert merged[0]["spec_status"] == "Core / Core / N/A / N/A"
+
+
+def spec_index(final_agent, *names):
+    return final_agent._spec_token_index([{"name": name, "options": ""} for name in names])
+
+
+def test_best_spec_match_prefers_exact_name_over_earlier_superset(final_agent):
+    index = spec_index(final_agent, "Input Power", "Power")
+    
+    match = final_agent._best_spec_match(final_agent._spec_name_tokens("Power"), index)
+    
+    assert match["name"] == "Power"
+
+
+def test_best_spec_match_takes_highest_overlap(final_agent):
+    index = spec_index(final_agent, "RAM", "RAM Size", "Storage Size")
+    
+    match = final_agent._best_spec_match(final_agent._spec_name_tokens("RAM Size GB"), index)
+    
+    assert match["name"] == "RAM Size"
+
+
+def test_best_spec_match_rejects_ambiguous_and_distant_names(final_agent):
+    index = spec_index(final_agent, "Input Power", "Output Power", "Blade Material")
+    
+    assert final_agent._best_spec_match(final_agent._spec_name_tokens("Power"), index) is None
+    assert final_agent._best_spec_match(final_agent._spec_name_tokens("Handle Material"), index) is None
+
+
+def test_best_spec_match_sends_bare_subsets_to_the_llm(final_agent):
+    index = spec_index(final_agent, "RAM Size")
+    
+    assert final_agent._best_spec_match(final_agent._spec_name_tokens("RAM"), index) is None
+
+
+def test_local_validate_passes_rows_matching_both_sources(final_agent):
+    final_table = [{"Specification": "Colour", "Top Options": "Red, Blue"}]
+    csv_specs = [{"name": "Color", "options": "Red, Blue, Green"}]
+    pns_specs = [{"name": "color", "options": "Blue / Red"}]
+    
+    result = final_agent._local_validate(final_table, csv_specs, pns_specs)
+    
+    assert result["is_valid"] is True
+    assert result["errors"] == []
+
+
+def test_local_validate_falls_through_on_unknown_option_or_spec(final_agent):
+    csv_specs = [{"name": "Color", "options": "Red, Blue"}]
+    pns_specs = [{"name": "Color", "options": "Red / Blue"}]
+    
+    unknown_option = [{"Specification": "Color", "Top Options": "Red, Black"}]
+    unknown_spec = [{"Specification": "Weight", "Top Options": "Red"}]
+    
+    assert final_agent._local_validate(unknown_option, csv_specs, pns_specs) is None
+    assert final_agent._local_validate(unknown_spec, csv_specs, pns_specs) is None
+
+
+@pytest.mark.parametrize("top_options, source_options", [
+    ("Steel, Iron", "Stainless Steel, Cast Iron"),
+    ("HP 5", "3 HP, 5 HP"),
+    ("5 HP", "3 HP / 5 HP 2 Stage"),
+])
+def test_local_validate_requires_whole_options(final_agent, top_options, source_options):
+    final_table = [{"Specification": "Material", "Top Options": top_options}]
+    sources = [{"name": "Material", "options": source_options}]
+    
+    assert final_agent._local_validate(final_table, sources, sources) is None
+
+
+def test_local_validate_sends_empty_table_to_the_llm(final_agent):
+    sources = [{"name": "Color", "options": "Red"}]
+    
+    assert final_agent._local_validate([], sources, sources) is None
+
+
+class FakeStreamingLLM:
+    def __init__(self, response, chunk_size=7):
+        self.chunks = [response[i:i + chunk_size] for i in range(0, len(response), chunk_size)]
+        self.chunks_sent = 0
+    
+    def stream(self, messages):
+        for chunk in self.chunks:
+            self.chunks_sent += 1
+            yield SimpleNamespace(content=chunk)
+
+
+STAGE1_RESPONSE = (
+    "| Specification Name | Top Options | Why | Pricing | Sources |\n"
+    "|---|---|---|---|---|\n"
+    "| Power | 1 HP | Sizing | Yes | search_keywords |\n"
+    "| Voltage | 220 V | Wiring | No | pns_data |\n"
+    "\n"
+    "Notes: both rows are core specifications.\n"
+    "More commentary that should never be read."
+)
+
+
+def test_invoke_until_table_end_stops_at_trailing_commentary():
+    llm = FakeStreamingLLM(STAGE1_RESPONSE)
+    
+    response = triangulation_agent._invoke_until_table_end(llm, "prompt")
+    
+    assert response == STAGE1_RESPONSE[:STAGE1_RESPONSE.index("\n\nNotes")]
+    assert llm.chunks_sent < len(llm.chunks)
+
+
+class FakeValidationLLM:
+    def __init__(self, parsed=None, raw_text=""):
+        self.response = {"parsed": parsed, "raw": SimpleNamespace(content=raw_text), "parsing_error": None if parsed else "bad json"}
+        self.calls = 0
+    
+    def invoke(self, messages):
+        self.calls += 1
+        return self.response
+
+
+def test_validate_final_result_uses_structured_verdict(final_agent):
+    verdict = ValidationResult(is_valid=False, error_summary="Extra spec",
+                               errors=[SpecValidation(spec_name="Weight", check="Exists in PNS", explanation="Only in CSV")])
+    final_agent.validation_llm = FakeValidationLLM(parsed=verdict)
+    
+    result = final_agent._validate_final_result("table", "", [], "Pump", ("csv", "pns"))
+    
+    assert result["is_valid"] is False
+    assert result["errors"] == ["Weight: Exists in PNS: NO - Only in CSV"]
+
+
+def test_validate_final_result_reads_json_reply_without_second_call(final_agent):
+    raw_text = '{"is_valid": true, "error_summary": "", "errors": [], "correction_needed": ""}'
+    final_agent.validation_llm = FakeValidationLLM(raw_text=raw_text)
+    
+    result = final_agent._validate_final_result("table", "", [], "Pump", ("csv", "pns"))
+    
+    assert result["is_valid"] is True
+    assert final_agent.validation_llm.calls == 1
+
+
+def test_validate_final_result_falls_back_to_legacy_text_format(final_agent):
+    final_agent.validation_llm = FakeValidationLLM(raw_text="OVERALL_VALID: YES\nERROR_SUMMARY: None")
+    
+    result = final_agent._validate_final_result("table", "", [], "Pump", ("csv", "pns"))
+    
+    assert result["is_valid"] is True
+    assert result["summary"] == "None"
+    assert final_agent.validation_llm.calls == 1
+
+
+def test_parse_validation_response_hands_out_independent_copies(final_agent):
+    response = "- Spec Name: Weight\n- Exists in PNS: NO - Only in CSV\nOVERALL_VALID: NO"
+    
+    first = final_agent._parse_validation_response(response)
+    first["errors"].append("caller note")
+    first["is_valid"] = True
+    second = final_agent._parse_validation_response(response)
+    
+    assert second["is_valid"] is False
+    assert second["errors"] == ["Weight: - Exists in PNS: NO - Only in CSV"]
+
+
+@pytest.fixture
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(triangulation_agent, "_PARSE_CACHE", OrderedDict())
+    monkeypatch.setattr(triangulation_agent, "_RESPONSE_CACHE", OrderedDict())
+    monkeypatch.setattr(triangulation_agent, "RESPONSE_CACHE_DB", "")
+    monkeypatch.setattr(triangulation_agent, "RESPONSE_CACHE_TTL_SECONDS", 3600)
+
+
+def test_cached_parse_reuses_rows_and_hands_out_copies(fresh_caches):
+    parsed = []
+    
+    def parse(text):
+        parsed.append(text)
+        return [{"Specification": text}]
+    
+    first = triangulation_agent._cached_parse("final", "Power", parse)
+    first[0]["Specification"] = "changed by caller"
+    second = triangulation_agent._cached_parse("final", "Power", parse)
+    other_kind = triangulation_agent._cached_parse("triangulation", "Power", parse)
+    
+    assert second == [{"Specification": "Power"}]
+    assert other_kind == [{"Specification": "Power"}]
+    assert parsed == ["Power", "Power"]
+
+
+class FakeInvokeLLM:
+    def __init__(self, model_name="gpt-test", temperature=0.1, table=True):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.table = table
+        self.prompts = []
+    
+    def invoke(self, messages):
+        self.prompts.append(messages[0].content)
+        if not self.table:
+            return SimpleNamespace(content="Sorry, I could not build the table")
+        return SimpleNamespace(content=f"| Power | response {len(self.prompts)} | Sizing | Yes |")
+
+
+def product_prompt(product_name):
+    return f"data\n<context>\nProduct: {product_name}\n</context>"
+
+
+def test_response_cache_hits_for_same_prompt_and_normalized_product(fresh_caches):
+    llm = FakeInvokeLLM()
+    
+    first = triangulation_agent._cached_invoke(llm, product_prompt("Water Pump"), "Water Pump")
+    again = triangulation_agent._cached_invoke(llm, product_prompt("water  pump"), "water  pump")
+    
+    assert first == again == "| Power | response 1 | Sizing | Yes |"
+    assert len(llm.prompts) == 1
+
+
+def test_response_cache_misses_on_other_model_settings_or_data(fresh_caches):
+    prompt = product_prompt("Pump")
+    
+    triangulation_agent._cached_invoke(FakeInvokeLLM(), prompt, "Pump")
+    warmer = FakeInvokeLLM(temperature=0.7)
+    other_data = FakeInvokeLLM()
+    triangulation_agent._cached_invoke(warmer, prompt, "Pump")
+    triangulation_agent._cached_invoke(other_data, "more " + prompt, "Pump")
+    
+    assert len(warmer.prompts) == 1
+    assert len(other_data.prompts) == 1
+
+
+def test_response_cache_disabled_with_zero_ttl(fresh_caches, monkeypatch):
+    monkeypatch.setattr(triangulation_agent, "RESPONSE_CACHE_TTL_SECONDS", 0)
+    llm = FakeInvokeLLM()
+    
+    triangulation_agent._cached_invoke(llm, "prompt")
+    triangulation_agent._cached_invoke(llm, "prompt")
+    
+    assert len(llm.prompts) == 2
+
+
+@pytest.mark.parametrize("pns_name", ["Power Supply", "Motor Power Rating"])
+def test_local_validate_requires_exact_pns_name(final_agent, pns_name):
+    final_table = [{"Specification": "Motor Power", "Top Options": "1 HP"}]
+    csv_specs = [{"name": "Motor Power", "options": "1 HP, 2 HP"}]
+    pns_specs = [{"name": pns_name, "options": "1 HP / 2 HP"}]
+    
+    assert final_agent._local_validate(final_table, csv_specs, pns_specs) is None
+
+
+def test_local_validate_accepts_pns_synonym(final_agent):
+    final_table = [{"Specification": "Power", "Top Options": "1 HP"}]
+    csv_specs = [{"name": "Power", "options": "1 HP, 2 HP"}]
+    pns_specs = [{"name": "Wattage", "options": "1 HP / 2 HP"}]
+    
+    assert final_agent._local_validate(final_table, csv_specs, pns_specs)["is_valid"] is True
+
+
+def test_response_cache_skips_replies_without_table_rows(fresh_caches):
+    llm = FakeInvokeLLM(table=False)
+    
+    triangulation_agent._cached_invoke(llm, product_prompt("Pump"), "Pump")
+    triangulation_agent._cached_invoke(llm, product_prompt("Pump"), "Pump")
+    
+    assert len(llm.prompts) == 2